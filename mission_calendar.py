@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Launch calendar index.
+#
+# The notebook answers each calendar question with its own pass over df_data
+# (Month.value_counts(), groupby(['Year','Month']) ...). CalendarIndex counts every launch
+# once into dense Year x Month x DayOfWeek x Hour arrays - one for all launches and one
+# per ISO / Organisation (and Location if asked for) - so any seasonality roll-up is just
+# a sum over the axes you don't want.
+#
+#   calendar = CalendarIndex.from_frame(df_data)
+#   calendar.counts('Month')                         # same numbers as month_popularity
+#   calendar.counts(['Year', 'Month'])               # launch_counts
+#   calendar.counts('Hour', dimension='ISO', keys=['USA', 'KAZ'])
+#   calendar.counts(['Organisation', 'Month'], years=range(1957, 1991))
+
+import numpy as np
+import pandas as pd
+
+from mission_cleaning import has_time_of_day, iso_codes, parse_dates
+
+
+AXES = ['Year', 'Month', 'DayOfWeek', 'Hour']
+DIMENSIONS = ['ISO', 'Organisation']
+
+# the last hour slot collects launches whose Date has no time of day
+UNKNOWN_HOUR = 24
+N_MONTHS, N_DAYS, N_HOURS = 12, 7, 25
+
+
+class CalendarIndex:
+    """Dense launch counts over Year x Month x DayOfWeek x Hour, in total and per group."""
+
+    def __init__(self, years, total, groups):
+        self.years = np.asarray(years)
+        # array of shape (years, 12, 7, 25)
+        self.total = total
+        # dimension -> (pd.Index of keys, array of shape (keys, years, 12, 7, 25))
+        self.groups = groups
+
+    @classmethod
+    def from_frame(cls, df, dimensions=DIMENSIONS, has_time=None):
+        """Build the index from a raw or cleaned mission table.
+
+        has_time -- boolean mask of rows whose Date carries a time of day. Defaults to the
+                    Has_Time column clean_missions adds, or is worked out from the strings
+                    when Date is still raw text. Parsed dates without either have an
+                    unknown hour, since a date-only launch looks like one at midnight.
+        """
+        dates = df['Date']
+        if has_time is None and 'Has_Time' in df:
+            has_time = df['Has_Time'].fillna(False)
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            if has_time is None:
+                has_time = has_time_of_day(dates)
+            dates = parse_dates(dates)
+        dates = pd.to_datetime(dates, utc=True)
+
+        valid = dates.notna().to_numpy()
+        dates = dates[valid]
+        has_time = np.zeros(len(dates), dtype=bool) if has_time is None else np.asarray(has_time, dtype=bool)[valid]
+
+        year = dates.dt.year.to_numpy()
+        years = np.arange(year.min(), year.max() + 1) if len(year) else np.empty(0, dtype=int)
+        hour = np.where(has_time, dates.dt.hour.to_numpy(), UNKNOWN_HOUR)
+
+        # position of every launch in the flattened (year, month, day, hour) array
+        cell = (((year - (years[0] if len(years) else 0)) * N_MONTHS
+                 + dates.dt.month.to_numpy() - 1) * N_DAYS
+                + dates.dt.dayofweek.to_numpy()) * N_HOURS + hour
+        shape = (len(years), N_MONTHS, N_DAYS, N_HOURS)
+        n_cells = int(np.prod(shape))
+
+        total = _shrink(np.bincount(cell, minlength=n_cells)).reshape(shape)
+
+        groups = {}
+        for dimension in dimensions:
+            if dimension == 'ISO' and 'ISO' not in df:
+                labels = iso_codes(df['Location'])
+            else:
+                labels = df[dimension]
+            codes, keys = pd.factorize(pd.Series(labels).to_numpy()[valid], sort=True)
+            known = codes >= 0
+            counts = np.bincount(codes[known] * n_cells + cell[known], minlength=len(keys) * n_cells)
+            groups[dimension] = (pd.Index(keys, name=dimension), _shrink(counts).reshape((len(keys),) + shape))
+        return cls(years, total, groups)
+
+    @property
+    def nbytes(self):
+        return self.total.nbytes + sum(counts.nbytes for _, counts in self.groups.values())
+
+    def _year_slice(self, years):
+        if years is None:
+            return slice(None), self.years
+        wanted = np.isin(self.years, np.asarray(list(years)))
+        return wanted, self.years[wanted]
+
+    def counts(self, by, dimension=None, keys=None, years=None, unknown_hour=False, dropzero=True):
+        """Launch counts rolled up to the axes in `by`.
+
+        by           -- one or more of Year, Month, DayOfWeek, Hour and the dimension name
+        dimension    -- ISO / Organisation / ... to restrict to or break down by
+        keys         -- only these values of the dimension
+        years        -- only these years
+        unknown_hour -- keep launches without a time of day (as Hour -1) when grouping by Hour
+        dropzero     -- drop empty cells, which is what the notebook's groupby would give
+
+        Returns a Series named 'Launches', with a MultiIndex when `by` has several axes.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        for axis in by:
+            if dimension is None and axis in self.groups:
+                dimension = axis
+            elif axis not in AXES and axis != dimension:
+                raise KeyError(f"Unknown calendar axis {axis!r}")
+
+        wanted_years, year_labels = self._year_slice(years)
+        if dimension is None:
+            counts = self.total[wanted_years][np.newaxis]
+            group_labels = pd.Index(['All'], name='All')
+        else:
+            group_labels, counts = self.groups[dimension]
+            if keys is not None:
+                positions = group_labels.get_indexer(list(keys))
+                group_labels, counts = group_labels[positions[positions >= 0]], counts[positions[positions >= 0]]
+            counts = counts[:, wanted_years]
+
+        labels = {
+            dimension or 'All': group_labels,
+            'Year': pd.Index(year_labels, name='Year'),
+            'Month': pd.RangeIndex(1, N_MONTHS + 1, name='Month'),
+            'DayOfWeek': pd.RangeIndex(N_DAYS, name='DayOfWeek'),
+            'Hour': pd.Index(list(range(UNKNOWN_HOUR)) + [-1], name='Hour'),
+        }
+        order = [dimension or 'All'] + AXES
+        if 'Hour' in by and not unknown_hour:
+            counts = counts[..., :UNKNOWN_HOUR]
+            labels['Hour'] = labels['Hour'][:UNKNOWN_HOUR]
+
+        summed = tuple(position for position, axis in enumerate(order) if axis not in by)
+        counts = counts.sum(axis=summed, dtype=np.int64)
+
+        # sum keeps the remaining axes in `order`, put them in the order asked for
+        kept = [axis for axis in order if axis in by]
+        counts = np.transpose(counts, [kept.index(axis) for axis in by])
+
+        if len(by) == 1:
+            index = labels[by[0]]
+        else:
+            index = pd.MultiIndex.from_product([labels[axis] for axis in by], names=by)
+        result = pd.Series(counts.ravel(), index=index, name='Launches')
+        return result[result > 0] if dropzero else result
+
+
+def _shrink(counts):
+    # counts per cell are small, store them in the narrowest dtype that holds them
+    for dtype in (np.uint16, np.uint32):
+        if counts.size == 0 or counts.max() <= np.iinfo(dtype).max:
+            return counts.astype(dtype)
+    return counts.astype(np.int64)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Cleaning steps from Space_Missions_Analysis.py pulled out into plain functions so the
+# other mission modules can reuse them without running the whole notebook script.
+
+import numpy as np
+import pandas as pd
+
+from iso3166 import countries
+
+
+# same manual mapping as the notebook
+location_dict = {
+    'Yellow Sea' :'China',
+    'Barents Sea' : 'Russian Federation',
+    'Shahrud Missile Test Site' :'Iran, Islamic Republic of',
+    'North Korea': 'Korea, Democratic People\'s Republic of',
+    'Pacific Missile Range Facility': 'USA',
+    'Gran Canaria' :'USA',
+    'Russia': 'Russian Federation'
+}
+
+# the columns of the raw mission_launches.csv the analysis uses
+MISSION_COLUMNS = ['Organisation', 'Location', 'Date', 'Detail', 'Rocket_Status', 'Price', 'Mission_Status']
+
+# columns holding text labels, these are the ones worth storing as categories
+LABEL_COLUMNS = ['Organisation', 'Location', 'Detail', 'Rocket_Status', 'Mission_Status']
+
+DATE_TIME_FORMAT = "%a %b %d, %Y %H:%M"
+ONLY_DATE_FORMAT = "%a %b %d, %Y"
+
+
+def get_iso(location):
+    try:
+
+        # loop through each dict key/value
+        for key, country in location_dict.items():
+            #if key is present anywhere in location string
+            if key in location:
+                #access the value of the key and get the 3 letter ISO code
+                return countries.get(country).alpha3
+
+         # if manual mapping doesn't work...
+        country_name = location.split(",")[-1].strip()
+        return countries.get(country_name).alpha3
+
+    except KeyError:
+        return None
+
+
+def iso_codes(locations):
+    """Vectorised get_iso: only the distinct Location strings are looked up."""
+    locations = pd.Series(locations)
+    codes, uniques = pd.factorize(locations)
+    lookup = np.array([get_iso(location) for location in uniques] + [None], dtype=object)
+    # factorize gives -1 for missing locations, which picks the trailing None
+    return pd.Series(lookup[codes], index=locations.index, name='ISO')
+
+
+def has_time_of_day(dates):
+    """True for Date strings that carry a time of day ("... 2020 15:57 UTC"), as a numpy bool array.
+
+    Parsed dates can't tell a date-only launch from one at midnight, so clean_missions keeps
+    this as the Has_Time column.
+    """
+    dates = pd.Series(dates)
+    return dates.astype('string').str.contains(':', regex=False).fillna(False).to_numpy(bool)
+
+
+def parse_dates(dates):
+    """Vectorised date_process: parse both date formats in the column to UTC timestamps.
+
+    Rows matching neither format come back as NaT instead of raising.
+    """
+    dates = pd.Series(dates)
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return pd.to_datetime(dates, utc=True)
+
+    text = dates.astype('string').str.replace(r'\s*UTC$', '', regex=True).str.strip()
+    parsed = pd.to_datetime(text, format=DATE_TIME_FORMAT, errors='coerce')
+    # for values with date-only we fall back to the shorter format
+    date_only = parsed.isna()
+    if date_only.any():
+        parsed[date_only] = pd.to_datetime(text[date_only], format=ONLY_DATE_FORMAT, errors='coerce')
+    return parsed.dt.tz_localize('UTC')
+
+
+def parse_prices(prices):
+    """Price column ("5,000.0" style strings, USD millions) to float, missing or junk become NaN."""
+    prices = pd.Series(prices)
+    if pd.api.types.is_numeric_dtype(prices):
+        return prices.astype(float)
+    return pd.to_numeric(prices.astype('string').str.replace(',', '', regex=False), errors='coerce').astype(float)
+
+
+def clean_missions(df, categorical=True):
+    """Return a typed copy of the raw mission table.
+
+    Adds the ISO, Year and Month columns the notebook builds, parses Date and Price and
+    (optionally) stores the label columns as pandas categories. Has_Time records which
+    raw Date strings had a time of day (only when Date is still text).
+    """
+    df = df.copy()
+    if 'Date' in df:
+        if 'Has_Time' not in df and not pd.api.types.is_datetime64_any_dtype(df['Date']):
+            df['Has_Time'] = has_time_of_day(df['Date'])
+        df['Date'] = parse_dates(df['Date'])
+        if 'Year' not in df:
+            df['Year'] = df['Date'].dt.year.astype('Int16')
+        if 'Month' not in df:
+            df['Month'] = df['Date'].dt.month.astype('Int8')
+    if 'Price' in df:
+        df['Price'] = parse_prices(df['Price'])
+    if 'Location' in df and 'ISO' not in df:
+        df['ISO'] = iso_codes(df['Location'])
+    if categorical:
+        for column in LABEL_COLUMNS + ['ISO']:
+            if column in df and not isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype('category')
+    return df
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Launch costs in real dollars.
+#
+# cost_line scatters every nominal Price against Date, and money_spent_per_org /
+# org_avg_spend add up dollars from 1960 and 2020 as if they were worth the same. Here
+# prices are deflated with the bundled cpi_us.csv (US CPI-U annual averages from the BLS,
+# 1982-84 = 100, no network needed) in one merge on Year, and the cost dashboard gets
+# small pre-aggregated tables instead of one point per launch:
+#
+#   priced = real_prices(df_data)                     # adds CPI and Real_Price columns
+#   spend_table(df_data, 'Organisation', 'decade')    # nominal and real spend per org/decade
+#   cost_per_success(df_data)                         # real spend per successful launch
+#   tables = cost_dashboard(df_data)                  # everything the dashboard plots
+#
+# Prices are in $ millions like the notebook. Real prices are in dollars of `base_year`,
+# the last year of the CPI table unless given.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from mission_cleaning import clean_missions
+
+
+CPI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cpi_us.csv')
+PERIODS = ['year', 'decade']
+
+
+def load_cpi(path=CPI_PATH):
+    """The offline CPI table: Year, CPI."""
+    cpi = pd.read_csv(path, dtype={'Year': np.int64, 'CPI': np.float64})
+    return cpi.sort_values('Year', ignore_index=True)
+
+
+def _cleaned(df):
+    if not pd.api.types.is_datetime64_any_dtype(df['Date']) or 'ISO' not in df:
+        df = clean_missions(df, categorical=False)
+    return df
+
+
+def real_prices(df, base_year=None, cpi=None, dropna=True):
+    """The mission table with CPI and Real_Price columns added.
+
+    The CPI is joined on Year in a single merge. Years outside the CPI table use the
+    closest year in it. dropna drops launches without a price, like df_data_clean.
+    """
+    df = _cleaned(df)
+    cpi = load_cpi() if cpi is None else cpi
+    base_year = int(cpi['Year'].iloc[-1]) if base_year is None else int(base_year)
+    base = cpi.loc[cpi['Year'] == base_year, 'CPI']
+    if base.empty:
+        raise ValueError(f"No CPI for base year {base_year}, "
+                         f"the table covers {cpi['Year'].iloc[0]}-{cpi['Year'].iloc[-1]}")
+
+    priced = df[df['Price'].notna() & df['Year'].notna()] if dropna else df
+    year = pd.Series(pd.array(priced['Year'], dtype='Int64')).clip(cpi['Year'].iloc[0], cpi['Year'].iloc[-1])
+    joined = pd.DataFrame({'Year': year}).merge(cpi.astype({'Year': 'Int64'}), on='Year', how='left')
+
+    priced = priced.copy()
+    priced['CPI'] = joined['CPI'].to_numpy()
+    priced['Real_Price'] = priced['Price'].to_numpy(float, na_value=np.nan) * base.iloc[0] / priced['CPI']
+    return priced
+
+
+def _period(priced, period):
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {PERIODS}, not {period!r}")
+    year = pd.array(priced['Year'], dtype='Int64')
+    return ('Year', year) if period == 'year' else ('Decade', year // 10 * 10)
+
+
+def spend_table(df, by='Organisation', period='year', base_year=None):
+    """Nominal and real spend per `by` (None for everything) and year or decade.
+
+    Columns: Launches (priced launches), Spend, Real_Spend, Avg_Real_Price,
+    Median_Real_Price.
+    """
+    priced = real_prices(df, base_year)
+    name, periods = _period(priced, period)
+    keys = ([priced[by].astype(object).to_numpy()] if by else []) + [periods]
+    grouped = priced.groupby(keys, sort=True, observed=True)
+    table = pd.DataFrame({
+        'Launches': grouped['Real_Price'].size(),
+        'Spend': grouped['Price'].sum(),
+        'Real_Spend': grouped['Real_Price'].sum(),
+        'Avg_Real_Price': grouped['Real_Price'].mean(),
+        'Median_Real_Price': grouped['Real_Price'].median(),
+    })
+    table.index.names = ([by] if by else []) + [name]
+    return table.reset_index()
+
+
+def rolling_median(df, years=5, by=None, base_year=None):
+    """Median real price per launch over the trailing `years`, at the end of every year.
+
+    A time-based rolling window over the launches sorted by date (per `by` group if
+    given), read off at each group's last launch of the year.
+    """
+    priced = real_prices(df, base_year)
+    priced = priced[priced['Date'].notna()]
+    columns = ([by] if by else []) + ['Date']
+    priced = priced.sort_values(columns, kind='stable')
+    series = pd.Series(priced['Real_Price'].to_numpy(), index=pd.DatetimeIndex(priced['Date'], name='Date'))
+    window = f'{int(round(365.25 * years))}D'
+
+    if by:
+        groups = priced[by].astype(object).to_numpy()
+        medians = series.groupby(groups, sort=False).rolling(window).median().to_numpy()
+    else:
+        medians = series.rolling(window).median().to_numpy()
+
+    table = pd.DataFrame({'Year': pd.array(priced['Year'], dtype='Int64'), 'Rolling_Median': medians})
+    if by:
+        table.insert(0, by, priced[by].astype(object).to_numpy())
+    # rolling values are in date order within each group, so the last one is the year end
+    return table.groupby(([by] if by else []) + ['Year'], sort=True).last().reset_index()
+
+
+def cost_per_success(df, by='Organisation', base_year=None):
+    """Real spend per successful launch, counting only launches with a price.
+
+    Cost_Per_Success is NaN for groups without a priced success.
+    """
+    priced = real_prices(df, base_year)
+    success = (priced['Mission_Status'].astype('string') == 'Success').fillna(False).to_numpy()
+    grouped = pd.DataFrame({
+        by: priced[by].astype(object).to_numpy(),
+        'Launches': 1,
+        'Successes': success.astype(np.int64),
+        'Real_Spend': priced['Real_Price'].to_numpy(),
+    }).groupby(by, sort=False).sum()
+    grouped['Cost_Per_Success'] = grouped['Real_Spend'] / grouped['Successes'].replace(0, np.nan)
+    return grouped.sort_values('Cost_Per_Success', ascending=False).reset_index()
+
+
+def cost_dashboard(df, base_year=None, years=5):
+    """Every table the cost dashboard plots, computed once.
+
+    yearly             spend and median real price per year (replaces the cost_line scatter)
+    org_year           spend per Organisation and year
+    org_decade         spend per Organisation and decade
+    rolling_median     trailing `years` median real price per year
+    org_rolling_median the same per Organisation
+    cost_per_success   real spend per successful launch per Organisation
+    """
+    df = _cleaned(df)
+    return {
+        'yearly': spend_table(df, None, 'year', base_year),
+        'org_year': spend_table(df, 'Organisation', 'year', base_year),
+        'org_decade': spend_table(df, 'Organisation', 'decade', base_year),
+        'rolling_median': rolling_median(df, years, None, base_year),
+        'org_rolling_median': rolling_median(df, years, 'Organisation', base_year),
+        'cost_per_success': cost_per_success(df, 'Organisation', base_year),
+    }
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Reading the mission launches when they are split over many files, e.g.
+#
+#   launches/provider=nextspaceflight/Year=1990/part-0.csv
+#   launches/provider=nextspaceflight/Year=1991/part-0.parquet
+#
+# Directory names of the form key=value are treated as partition columns. Filters on
+# those columns are checked against the path first so non-matching files are never
+# opened, the remaining files are read concurrently and glued into one typed table.
+
+import glob
+import numbers
+import operator
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+
+from mission_cleaning import MISSION_COLUMNS, clean_missions
+
+
+SUPPORTED_SUFFIXES = ('.csv', '.parquet', '.pq')
+
+OPERATORS = {
+    '==': operator.eq,
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda left, right: left in right,
+    'not in': lambda left, right: left not in right,
+}
+
+
+def list_partitions(source):
+    """Expand a file, directory, glob pattern or list of those into sorted data file paths."""
+    if isinstance(source, (list, tuple)):
+        return sorted({path for item in source for path in list_partitions(item)})
+
+    source = os.fspath(source)
+    if os.path.isdir(source):
+        paths = [os.path.join(root, name)
+                 for root, _, names in os.walk(source)
+                 for name in names]
+    elif os.path.isfile(source):
+        return [source]
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(path for path in paths
+                  if path.lower().endswith(SUPPORTED_SUFFIXES)
+                  and not os.path.basename(path).startswith(('.', '_')))
+
+
+def partition_values(path):
+    """Read the key=value parts of a partition path, e.g. {'Year': '1990'}."""
+    values = {}
+    for part in os.path.normpath(os.path.dirname(path)).split(os.sep):
+        key, sep, value = part.partition('=')
+        if sep and key:
+            values[unquote(key)] = unquote(value)
+    return values
+
+
+def _check_filters(filters):
+    filters = list(filters or [])
+    for column, op, value in filters:
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported filter operator {op!r} for column {column!r}")
+    return filters
+
+
+def _coerce(text, like):
+    # partition values come out of the path as strings, compare them as the filter value's type
+    # numbers.* so numpy scalars straight out of pandas (df.Year.unique()) count too
+    collection = isinstance(like, (set, frozenset, list, tuple, np.ndarray, pd.Index))
+    sample = next(iter(like)) if collection and len(like) else like
+    if isinstance(sample, (bool, np.bool_)) or not isinstance(sample, numbers.Real):
+        return text
+    return int(text) if isinstance(sample, numbers.Integral) else float(text)
+
+
+def keep_partition(values, filters):
+    """True unless one of the filters rules out every row in this partition."""
+    for column, op, value in filters:
+        if column not in values:
+            continue
+        try:
+            partition_value = _coerce(values[column], value)
+            keep = OPERATORS[op](partition_value, value)
+        except (ValueError, TypeError):
+            # can't compare, so we have to open the file to find out
+            continue
+        if not keep:
+            return False
+    return True
+
+
+def _read_partition(path, columns):
+    if path.lower().endswith('.csv'):
+        usecols = (lambda name: name in columns) if columns is not None else None
+        frame = pd.read_csv(path, usecols=usecols)
+    else:
+        frame = pd.read_parquet(path, columns=columns)
+
+    for key, value in partition_values(path).items():
+        if key not in frame:
+            frame[key] = int(value) if value.lstrip('-').isdigit() else value
+    return frame
+
+
+def _empty_frame(source, columns):
+    # nothing left to read: still return the columns (and partition keys) a read would have
+    df = pd.DataFrame({column: pd.Series(dtype=object)
+                       for column in (columns if columns is not None else MISSION_COLUMNS)})
+    keys = {}
+    for path in list_partitions(source):
+        for key, value in partition_values(path).items():
+            keys.setdefault(key, []).append(value)
+    for key, values in keys.items():
+        if key not in df:
+            numeric = all(value.lstrip('-').isdigit() for value in values)
+            df[key] = pd.Series(dtype='int64' if numeric else object)
+    return df
+
+
+def _row_mask(df, filters):
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters:
+        if column not in df:
+            raise KeyError(f"Filter column {column!r} is not in the dataset")
+        series = df[column]
+        if op in ('in', 'not in'):
+            hit = series.isin(list(value))
+            mask &= ~hit if op == 'not in' else hit
+        else:
+            if not pd.api.types.is_numeric_dtype(series) and isinstance(value, (int, float)):
+                series = pd.to_numeric(series, errors='coerce')
+            mask &= OPERATORS[op](series, value).fillna(False).astype(bool)
+    return mask
+
+
+def read_missions(source, filters=None, columns=None, max_workers=None, clean=True):
+    """Read a partitioned mission dataset into a single DataFrame.
+
+    source      -- a CSV/Parquet file, a directory of partitions, a glob pattern or a list of these
+    filters     -- list of (column, op, value) tuples, e.g. [('Year', '<', 1991)] or
+                   [('Organisation', 'in', top_10_orgs)]; ops are ==, !=, <, <=, >, >=, in, not in
+    columns     -- only read these data columns (partition columns are always added)
+    max_workers -- size of the reading thread pool, defaults to the ThreadPoolExecutor default
+    clean       -- run clean_missions so Date/Price/ISO/Year/Month come back typed
+
+    Filters on partition columns prune whole files before they are read. Every filter is
+    then applied to the rows as well, after cleaning, so filtering on Year works whether
+    or not the data is partitioned by it.
+    """
+    filters = _check_filters(filters)
+    paths = [path for path in list_partitions(source)
+             if keep_partition(partition_values(path), filters)]
+
+    if columns is not None:
+        columns = list(columns)
+
+    if not paths:
+        df = _empty_frame(source, columns)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            frames = list(pool.map(lambda path: _read_partition(path, columns), paths))
+        df = pd.concat(frames, ignore_index=True)
+
+    if clean:
+        df = clean_missions(df)
+
+    if filters and len(df):
+        df = df.loc[_row_mask(df, filters)].reset_index(drop=True)
+    return df
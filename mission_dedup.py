@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Change detection for re-scraped mission data.
+#
+# Every row gets two 64 bit hashes: one over the mission identity (Organisation, Detail,
+# Date, Location) and one over everything else (Mission_Status, Price, ...). MissionIndex
+# remembers the identity -> content hash pairs it has seen, so an overlapping scrape can
+# be split into new, changed, unchanged and duplicate rows in a single hashed pass and
+# only the new or changed rows are handed on to the aggregations.
+
+import numpy as np
+import pandas as pd
+
+from mission_cleaning import parse_dates, parse_prices
+
+
+IDENTITY_COLUMNS = ['Organisation', 'Detail', 'Date', 'Location']
+
+NEW = 'new'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+DUPLICATE = 'duplicate'
+CHANGE_LABELS = [NEW, CHANGED, UNCHANGED, DUPLICATE]
+
+# added by clean_missions from Location/Date, so they never hold changes of their own
+DERIVED_COLUMNS = ['ISO', 'Year', 'Month', 'Has_Time']
+
+
+def _content_columns(df, identity):
+    # the Unnamed columns are just row numbers from the scrape and shift between runs
+    return [column for column in df.columns
+            if column not in identity and column not in DERIVED_COLUMNS
+            and not str(column).startswith('Unnamed')]
+
+
+def _normalise(df, columns):
+    # hash parsed Date/Price so raw scrapes and cleaned tables give the same hashes
+    out = pd.DataFrame(index=df.index)
+    for column in columns:
+        series = df[column]
+        if column == 'Date':
+            series = pd.Series(parse_dates(series).to_numpy('datetime64[ns]').view('int64'), index=df.index)
+        elif column == 'Price':
+            series = parse_prices(series)
+        elif isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+            series = series.astype('string')
+        out[column] = series
+    return out
+
+
+def hash_rows(df, columns):
+    """One uint64 hash per row over the given columns."""
+    if not columns:
+        return np.zeros(len(df), dtype=np.uint64)
+    return pd.util.hash_pandas_object(_normalise(df, columns), index=False).to_numpy(np.uint64)
+
+
+def duplicate_mask(df, identity=IDENTITY_COLUMNS, keep='last'):
+    """Boolean mask of rows whose mission identity already appears elsewhere in df."""
+    return pd.Series(hash_rows(df, list(identity)), index=df.index).duplicated(keep=keep)
+
+
+class MissionIndex:
+    """Identity hash -> content hash index over every mission seen so far."""
+
+    def __init__(self, identity=IDENTITY_COLUMNS, content=None):
+        self.identity = list(identity)
+        self.content = None if content is None else list(content)
+        self._keys = pd.Index(np.empty(0, dtype=np.uint64))
+        self._hashes = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _hash(self, df):
+        content = self.content if self.content is not None else _content_columns(df, self.identity)
+        return hash_rows(df, self.identity), hash_rows(df, content)
+
+    def _classify(self, keys, hashes):
+        labels = np.full(len(keys), UNCHANGED, dtype=object)
+
+        # within one scrape the last copy of a mission wins
+        duplicate = pd.Series(keys).duplicated(keep='last').to_numpy()
+
+        position = self._keys.get_indexer(keys)
+        known = position >= 0
+        changed = known.copy()
+        changed[known] = self._hashes[position[known]] != hashes[known]
+
+        labels[~known] = NEW
+        labels[changed] = CHANGED
+        labels[duplicate] = DUPLICATE
+        return labels
+
+    def classify(self, df):
+        """Label every row of df as new / changed / unchanged / duplicate without updating the index."""
+        keys, hashes = self._hash(df)
+        labels = self._classify(keys, hashes)
+        return pd.Series(pd.Categorical(labels, categories=CHANGE_LABELS), index=df.index, name='Change')
+
+    def update(self, df):
+        """Add a scrape to the index and return only its new or changed rows.
+
+        The returned frame has an extra Change column saying which of the two it is.
+        """
+        keys, hashes = self._hash(df)
+        labels = self._classify(keys, hashes)
+        emit = (labels == NEW) | (labels == CHANGED)
+
+        changed = labels == CHANGED
+        if changed.any():
+            self._hashes[self._keys.get_indexer(keys[changed])] = hashes[changed]
+        added = labels == NEW
+        if added.any():
+            self._keys = self._keys.append(pd.Index(keys[added]))
+            self._hashes = np.concatenate([self._hashes, hashes[added]])
+
+        out = df.loc[emit].copy()
+        out['Change'] = pd.Categorical(labels[emit], categories=[NEW, CHANGED])
+        return out
+
+    def save(self, path):
+        np.savez(path, keys=self._keys.to_numpy(np.uint64), hashes=self._hashes,
+                 identity=np.array(self.identity),
+                 content=np.array(self.content if self.content is not None else [], dtype=str),
+                 has_content=self.content is not None)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            content = list(data['content']) if bool(data['has_content']) else None
+            index = cls(identity=list(data['identity']), content=content)
+            index._keys = pd.Index(data['keys'])
+            index._hashes = data['hashes'].copy()
+        return index
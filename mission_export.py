@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Export to a local SQLite database for BI tools.
+#
+# Instead of handing out CSVs of every aggregate that downstream tools re-join, this
+# writes the cleaned mission table plus materialised summary tables into one SQLite
+# file (sqlite3 ships with Python, nothing goes over the network):
+#
+#   missions            one row per launch, indexed on Year, ISO, Organisation
+#   summary_org_year    launches / successes / failures / spend per Organisation and Year
+#   summary_iso_year    the same per ISO and Year
+#   summary_year_month  launches per Year and Month
+#   failure_rates       failures and failure percentage per Year
+#   spend_by_org        total and average price per Organisation
+#   yearly_leaders      the leading ISO and Organisation of every year
+#
+#   export_sqlite(df_data, 'missions.sqlite')
+#   export_sqlite(df_data, 'missions.sqlite', aggregates=compute_aggregates(df_raw)[0])
+#
+# Rows go in with executemany in batches inside one transaction and the indexes are
+# built after the load, which is much faster than indexing row by row.
+
+import os
+import sqlite3
+import stat
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from mission_cleaning import clean_missions
+
+
+BATCH_SIZE = 50_000
+
+MISSION_COLUMNS = {
+    'Organisation': 'TEXT',
+    'Location': 'TEXT',
+    'Date': 'TEXT',
+    'Detail': 'TEXT',
+    'Rocket_Status': 'TEXT',
+    'Price': 'REAL',
+    'Mission_Status': 'TEXT',
+    'ISO': 'TEXT',
+    'Year': 'INTEGER',
+    'Month': 'INTEGER',
+}
+
+INDEXES = {
+    'idx_missions_year': ['Year'],
+    'idx_missions_iso': ['ISO'],
+    'idx_missions_organisation': ['Organisation'],
+    'idx_missions_year_iso': ['Year', 'ISO'],
+    'idx_missions_year_organisation': ['Year', 'Organisation'],
+}
+
+# materialised summary tables, built inside the database from the indexed missions table
+SUMMARIES = {
+    'summary_org_year': """
+        SELECT Organisation, Year,
+               COUNT(*) AS Launches,
+               SUM(Mission_Status = 'Success') AS Successes,
+               SUM(Mission_Status != 'Success') AS Failures,
+               SUM(Price) AS Spend,
+               COUNT(Price) AS Priced_Launches
+        FROM missions
+        GROUP BY Organisation, Year
+    """,
+    'summary_iso_year': """
+        SELECT ISO, Year,
+               COUNT(*) AS Launches,
+               SUM(Mission_Status = 'Success') AS Successes,
+               SUM(Mission_Status != 'Success') AS Failures,
+               SUM(Price) AS Spend,
+               COUNT(Price) AS Priced_Launches
+        FROM missions
+        GROUP BY ISO, Year
+    """,
+    'summary_year_month': """
+        SELECT Year, Month, COUNT(*) AS Launches
+        FROM missions
+        GROUP BY Year, Month
+    """,
+    'failure_rates': """
+        SELECT Year,
+               COUNT(*) AS Launches,
+               SUM(Mission_Status != 'Success') AS Failures,
+               100.0 * SUM(Mission_Status != 'Success') / COUNT(*) AS Fail_Pct
+        FROM missions
+        GROUP BY Year
+    """,
+    'spend_by_org': """
+        SELECT Organisation,
+               SUM(Price) AS Total_Spend,
+               AVG(Price) AS Avg_Spend,
+               COUNT(Price) AS Priced_Launches
+        FROM missions
+        WHERE Price IS NOT NULL
+        GROUP BY Organisation
+    """,
+    'yearly_leaders': """
+        SELECT Year, Dimension, Leader, Launches
+        FROM (
+            SELECT Year, 'ISO' AS Dimension, ISO AS Leader, Launches,
+                   ROW_NUMBER() OVER (PARTITION BY Year ORDER BY Launches DESC, ISO) AS Position
+            FROM summary_iso_year WHERE ISO IS NOT NULL
+            UNION ALL
+            SELECT Year, 'Organisation', Organisation, Launches,
+                   ROW_NUMBER() OVER (PARTITION BY Year ORDER BY Launches DESC, Organisation)
+            FROM summary_org_year
+        )
+        WHERE Position = 1
+    """,
+}
+
+SUMMARY_INDEXES = {
+    'summary_org_year': ['Year', 'Organisation'],
+    'summary_iso_year': ['Year', 'ISO'],
+    'summary_year_month': ['Year', 'Month'],
+    'failure_rates': ['Year'],
+    'spend_by_org': ['Organisation'],
+    'yearly_leaders': ['Year', 'Dimension'],
+}
+
+
+def _mission_rows(df):
+    # cleaned table -> plain Python tuples sqlite3 can bind, None for missing values
+    columns = {}
+    for column, sql_type in MISSION_COLUMNS.items():
+        series = df[column] if column in df else pd.Series(None, index=df.index, dtype=object)
+        if column == 'Date':
+            values = pd.to_datetime(series, utc=True).dt.strftime('%Y-%m-%d %H:%M:%S')
+        elif sql_type == 'INTEGER':
+            values = pd.array(series, dtype='Int64')
+        elif sql_type == 'REAL':
+            values = pd.to_numeric(series, errors='coerce')
+        else:
+            values = series.astype(object)
+        values = pd.Series(values, index=df.index).astype(object)
+        columns[column] = values.where(pd.notna(values), None).map(
+            lambda value: value.item() if isinstance(value, np.generic) else value)
+    return pd.DataFrame(columns).itertuples(index=False, name=None)
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _create_index(cursor, name, table, columns):
+    cursor.execute(f'CREATE INDEX {name} ON {table} ({", ".join(columns)})')
+
+
+def export_sqlite(df, path, aggregates=None, batch_size=BATCH_SIZE, replace=True):
+    """Write the cleaned missions, their indexes and the summary tables to `path`.
+
+    df         -- raw or cleaned mission table (cleaned with clean_missions if needed)
+    aggregates -- optional {name: DataFrame/Series} of extra tables to store as is,
+                  e.g. the notebook aggregates from mission_snapshots.compute_aggregates
+    replace    -- overwrite an existing file instead of raising FileExistsError
+
+    The database is built in a temporary file next to `path` and moved over it only once
+    it is complete, so a failed export never leaves a half-written file and nothing from
+    an earlier export survives. Returns the list of tables written.
+    """
+    if not replace and os.path.exists(path):
+        raise FileExistsError(path)
+    _check_names(aggregates or {})
+    if not pd.api.types.is_datetime64_any_dtype(df['Date']) or 'ISO' not in df:
+        df = clean_missions(df, categorical=False)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temporary = tempfile.mkstemp(suffix='.sqlite.tmp', dir=directory)
+    os.close(handle)
+    try:
+        tables = _write_database(df, temporary, aggregates or {}, batch_size)
+        # mkstemp makes the file owner-only; give it the target's mode, or the usual
+        # mode for a new file, so BI tools running as other users can read it
+        os.chmod(temporary, _file_mode(path))
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+    return tables
+
+
+def _check_names(aggregates):
+    # fail before the load rather than in to_sql after it; SQLite names ignore case
+    taken = {name.lower() for name in ['missions'] + list(SUMMARIES)}
+    for name in aggregates:
+        if name.lower() in taken:
+            raise ValueError(f"Aggregate table {name!r} clashes with a table the export already writes")
+        taken.add(name.lower())
+
+
+def _file_mode(path):
+    if os.path.exists(path):
+        return stat.S_IMODE(os.stat(path).st_mode)
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _write_database(df, path, aggregates, batch_size):
+    connection = sqlite3.connect(path)
+    try:
+        cursor = connection.cursor()
+        # bulk load into a fresh file: no rollback journal or fsync per statement, a
+        # failure just throws the temporary file away
+        cursor.execute('PRAGMA journal_mode = OFF')
+        cursor.execute('PRAGMA synchronous = OFF')
+
+        schema = ', '.join(f'{column} {sql_type}' for column, sql_type in MISSION_COLUMNS.items())
+        cursor.execute(f'CREATE TABLE missions ({schema})')
+        insert = f'INSERT INTO missions VALUES ({", ".join("?" * len(MISSION_COLUMNS))})'
+
+        cursor.execute('BEGIN')
+        for batch in _batches(_mission_rows(df), batch_size):
+            cursor.executemany(insert, batch)
+        for name, columns in INDEXES.items():
+            _create_index(cursor, name, 'missions', columns)
+
+        for table, query in SUMMARIES.items():
+            cursor.execute(f'CREATE TABLE {table} AS {query}')
+            _create_index(cursor, f'idx_{table}', table, SUMMARY_INDEXES[table])
+        connection.commit()
+
+        for name, table in aggregates.items():
+            if isinstance(table, pd.Series):
+                table = table.reset_index()
+            table = table.copy()
+            for column in table.columns:
+                if pd.api.types.is_datetime64_any_dtype(table[column]):
+                    table[column] = pd.to_datetime(table[column], utc=True).dt.strftime('%Y-%m-%d %H:%M:%S')
+            table.to_sql(name, connection, index=False, chunksize=batch_size)
+
+        cursor.execute('ANALYZE')
+        connection.commit()
+        return ['missions'] + list(SUMMARIES) + list(aggregates)
+    finally:
+        connection.close()
+
+
+def query(path, sql, params=()):
+    """Run a query against an exported database and return a DataFrame."""
+    connection = sqlite3.connect(path)
+    try:
+        return pd.read_sql_query(sql, connection, params=params)
+    finally:
+        connection.close()
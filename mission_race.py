@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# "Bar chart race" frames for cumulative launches by country or organisation.
+#
+# The yearly leader charts (lead_org_bar, success_lead, leading_org) are static, and a
+# plotly animation with one full figure per frame gets to several megabytes of JSON. Here
+# all frames are worked out in one vectorised pass over the cumulative count matrix from
+# AsOfIndex: keyframes at the end of every year or month, `steps` linearly interpolated
+# frames between them, and the top N per frame picked with a single argsort. The result
+# is a compact payload (label ids, values and bar positions as small arrays) that a
+# player can step through without any pandas work.
+#
+#   history = AsOfIndex.from_frame(df_data, aliases={'ISO': {'KAZ': 'RUS'}})
+#   race = race_frames(history, 'Organisation', period='year', top_n=10, steps=4)
+#   race.frame(42)             # DataFrame for one frame, e.g. for px.bar
+#   race.to_json()             # compact payload for the front end
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+PERIODS = {
+    'year': 'YS',
+    'month': 'MS',
+}
+
+
+class RaceFrames:
+    """Precomputed bar-race frames: top N labels, values and positions per frame."""
+
+    def __init__(self, labels, times, top, values, positions, keyframe, metric):
+        self.labels = list(labels)
+        # frame time (UTC DatetimeIndex), interpolated frames get times in between
+        self.times = times
+        # (frames, top_n) arrays: label id, bar value, bar position (0 = first place)
+        self.top = top
+        self.values = values
+        self.positions = positions
+        # True for frames that sit exactly on a period end
+        self.keyframe = keyframe
+        self.metric = metric
+
+    def __len__(self):
+        return len(self.times)
+
+    def frame(self, number):
+        """One frame as a DataFrame sorted by rank."""
+        return pd.DataFrame({
+            'Label': [self.labels[label] for label in self.top[number]],
+            self.metric: self.values[number],
+            'Position': self.positions[number],
+        }).assign(Date=self.times[number])
+
+    def to_payload(self, decimals=2):
+        """Plain dict of lists, small enough to ship to a browser as is."""
+        return {
+            'metric': self.metric,
+            'labels': self.labels,
+            'times': [time.strftime('%Y-%m-%d') for time in self.times],
+            'keyframe': self.keyframe.astype(int).tolist(),
+            'top': self.top.tolist(),
+            'values': np.round(self.values, decimals).tolist(),
+            'positions': np.round(self.positions, decimals).tolist(),
+        }
+
+    def to_json(self, decimals=2):
+        return json.dumps(self.to_payload(decimals), separators=(',', ':'))
+
+    def save(self, path):
+        np.savez_compressed(path, labels=np.array(self.labels, dtype=str),
+                            times=self.times.tz_convert(None).as_unit('ns').asi8,
+                            top=self.top, values=self.values, positions=self.positions,
+                            keyframe=self.keyframe, metric=np.array(self.metric))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            times = pd.DatetimeIndex(data['times'].view('datetime64[ns]')).tz_localize('UTC')
+            return cls(data['labels'].tolist(), times, data['top'], data['values'],
+                       data['positions'], data['keyframe'], str(data['metric']))
+
+
+def _utc(date):
+    date = pd.Timestamp(date)
+    return date.tz_localize('UTC') if date.tzinfo is None else date.tz_convert('UTC')
+
+
+def _interpolate(keyframes, steps):
+    # (K, ...) keyframes -> ((K - 1) * steps + 1, ...) frames, linear in between
+    if steps <= 1 or len(keyframes) < 2:
+        return keyframes
+    fraction = (np.arange(steps) / steps).reshape((1, steps) + (1,) * (keyframes.ndim - 1))
+    start, change = keyframes[:-1, np.newaxis], (keyframes[1:] - keyframes[:-1])[:, np.newaxis]
+    between = (start + change * fraction).reshape((-1,) + keyframes.shape[1:])
+    return np.concatenate([between, keyframes[-1:]], axis=0)
+
+
+def race_frames(history, dimension='ISO', metric='Launches', period='year', top_n=10, steps=4,
+                start=None, end=None):
+    """Compute every frame of a bar chart race from an AsOfIndex.
+
+    history   -- mission_asof.AsOfIndex
+    dimension -- 'ISO' or 'Organisation' (any dimension the index was built with)
+    metric    -- Launches, Successes, Failures or Spend (cumulative)
+    period    -- 'year' or 'month' between keyframes
+    steps     -- frames per period, the extra ones are interpolated
+    """
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {sorted(PERIODS)}, not {period!r}")
+    times = pd.to_datetime(history.times, utc=True) if len(history.times) else None
+    if times is None:
+        raise ValueError("The history has no launches to animate")
+
+    start = _utc(start) if start is not None else times[0]
+    end = _utc(end) if end is not None else times[-1]
+    # a keyframe at the end of every period, plus one at `end` for the last partial period
+    boundaries = pd.date_range(start.normalize(), end, freq=PERIODS[period])
+    as_of = boundaries[boundaries > start].append(pd.DatetimeIndex([end + pd.Timedelta(1, 'ns')]))
+    as_of = as_of - pd.Timedelta(1, 'ns')
+    counts = history.frames(as_of, dimension, metric).to_numpy(np.float64)
+    labels = list(history.dimensions[dimension].keys)
+
+    # ranks at every keyframe (0 = leader), interpolated along with the values so bars glide
+    order = np.argsort(-counts, axis=1, kind='stable')
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(counts.shape[1])[np.newaxis, :], axis=1)
+
+    values = _interpolate(counts, steps)
+    positions = _interpolate(ranks.astype(np.float64), steps)
+
+    top_n = min(top_n, counts.shape[1])
+    top = np.argsort(-values, axis=1, kind='stable')[:, :top_n]
+    keyframe = np.zeros(len(values), dtype=bool)
+    keyframe[::max(steps, 1)] = True
+
+    # interpolate offsets from the first keyframe, float64 can't hold ns since 1970 exactly
+    key_times = as_of.as_unit('ns').asi8
+    offsets = _interpolate((key_times - key_times[0]).astype(np.float64), steps).astype(np.int64)
+    offsets[keyframe] = key_times - key_times[0]
+    frame_times = pd.DatetimeIndex((key_times[0] + offsets).view('datetime64[ns]')).tz_localize('UTC')
+
+    dtype = np.int16 if len(labels) < np.iinfo(np.int16).max else np.int32
+    return RaceFrames(labels, frame_times, top.astype(dtype),
+                      np.take_along_axis(values, top, axis=1).astype(np.float32),
+                      np.take_along_axis(positions, top, axis=1).astype(np.float32),
+                      keyframe, metric)
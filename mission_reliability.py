@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Reliability model for launches.
+#
+# The notebook stops at raw yearly failure percentages, which jump around for anyone
+# with a handful of launches (one failure out of two launches is "50% failure"). Here
+# every group (Organisation, ISO, Rocket_Status ...) x era cell is scored with a
+# Beta-Binomial model: a Beta prior fitted to all cells by empirical Bayes is updated
+# with the cell's own launches, so small cells are pulled towards the overall rate and
+# large cells keep their own.
+#
+# Everything works on dense count matrices built with np.bincount, there is no Python
+# loop over groups. Partial failures count as half a success by default.
+
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy import stats
+except ImportError:  # credible intervals fall back to a normal approximation
+    stats = None
+
+
+# how much of a success each Mission_Status is worth
+OUTCOME_WEIGHTS = {
+    'Success': 1.0,
+    'Partial Failure': 0.5,
+    'Failure': 0.0,
+    'Prelaunch Failure': 0.0,
+}
+
+# limits on the fitted prior strength (alpha + beta), so a tiny or perfectly uniform
+# dataset can't produce a flat or an infinitely confident prior
+MIN_PRIOR_STRENGTH = 2.0
+MAX_PRIOR_STRENGTH = 1e4
+
+
+def outcome_weights(status, partial_weight=OUTCOME_WEIGHTS['Partial Failure']):
+    """Success weight per mission, unknown labels count as failures."""
+    weights = dict(OUTCOME_WEIGHTS, **{'Partial Failure': partial_weight})
+    return pd.Series(status).astype('string').map(weights).fillna(0.0).to_numpy(float)
+
+
+def era_labels(years, era):
+    """Year -> era label: None (all time), 'Year', 'Decade' or a bin width in years."""
+    years = pd.array(years, dtype='Int64')
+    if era is None:
+        return np.full(len(years), 'All', dtype=object)
+    if era == 'Year':
+        return years
+    width = 10 if era == 'Decade' else int(era)
+    return years // width * width
+
+
+def _cells(df, by, era):
+    # flat (group, era) cell number of every row, -1 where a key is missing
+    if len(by) == 1:
+        group_codes, groups = pd.factorize(df[by[0]], sort=True)
+        groups = pd.Index(groups, name=by[0])
+    else:
+        group_codes, groups = pd.MultiIndex.from_frame(df[by].astype(object)).factorize(sort=True)
+        groups = pd.MultiIndex.from_tuples(groups, names=by)
+
+    year = df['Year'] if era is not None else np.zeros(len(df), dtype=int)
+    era_codes, eras = pd.factorize(era_labels(year, era), sort=True)
+    eras = pd.Index(eras, name='Era')
+
+    cell = np.where((group_codes >= 0) & (era_codes >= 0), group_codes * len(eras) + era_codes, -1)
+    return groups, eras, cell
+
+
+def _cell_index(groups, eras):
+    # group-major (groups x eras) index with one level per `by` column plus Era;
+    # from_product would fold a MultiIndex of groups into a single level of tuples
+    levels = [groups.get_level_values(level).repeat(len(eras)) for level in range(groups.nlevels)]
+    return pd.MultiIndex.from_arrays(levels + [np.tile(eras.to_numpy(), len(groups))],
+                                     names=list(groups.names) + [eras.name])
+
+
+def _matrix(cell, weights, shape):
+    keep = cell >= 0
+    counts = np.bincount(cell[keep], weights=None if weights is None else weights[keep],
+                         minlength=shape[0] * shape[1])
+    return counts.reshape(shape)
+
+
+def count_matrix(df, by, era=None, partial_weight=OUTCOME_WEIGHTS['Partial Failure']):
+    """Dense launches / weighted successes matrices of shape (groups, eras).
+
+    Returns (groups, eras, launches, successes) where groups is a pd.Index (a MultiIndex
+    when `by` has several columns) and eras a pd.Index of era labels.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    groups, eras, cell = _cells(df, by, era)
+    shape = (len(groups), len(eras))
+    launches = _matrix(cell, None, shape)
+    successes = _matrix(cell, outcome_weights(df['Mission_Status'], partial_weight), shape)
+    return groups, eras, launches, successes
+
+
+def fit_prior(launches, successes, full_output=False):
+    """Empirical-Bayes Beta(alpha, beta) prior from all cells by the method of moments.
+
+    When the spread between cells is no bigger than binomial noise alone would give, the
+    data can't tell the cells apart and the prior is fully pooled at MAX_PRIOR_STRENGTH.
+    full_output also returns that as a third value, `pooled`.
+    """
+    launches = np.asarray(launches, float).ravel()
+    successes = np.asarray(successes, float).ravel()
+    used = launches > 0
+    if not used.any():
+        return (1.0, 1.0, False) if full_output else (1.0, 1.0)
+    n, rate = launches[used], successes[used] / launches[used]
+
+    mean = np.average(rate, weights=n)
+    variance = np.average((rate - mean) ** 2, weights=n)
+    # take out the part of the spread binomial noise alone would produce, weighted by
+    # launches like the variance (p(1-p)/n per cell, so p(1-p) * cells / launches)
+    between = variance - mean * (1 - mean) * len(n) / n.sum()
+    pooled = bool(between <= 0 or mean in (0.0, 1.0))
+    if pooled:
+        strength = MAX_PRIOR_STRENGTH
+    else:
+        strength = np.clip(mean * (1 - mean) / between - 1, MIN_PRIOR_STRENGTH, MAX_PRIOR_STRENGTH)
+    mean = np.clip(mean, 1e-6, 1 - 1e-6)
+    if full_output:
+        return mean * strength, (1 - mean) * strength, pooled
+    return mean * strength, (1 - mean) * strength
+
+
+def _fitted_prior(launches, successes):
+    alpha, beta, pooled = fit_prior(launches, successes, full_output=True)
+    if pooled:
+        warnings.warn("Cells vary no more than binomial noise, the prior is fully pooled to the "
+                      "overall rate; pass prior= to choose its strength", RuntimeWarning, stacklevel=3)
+    return alpha, beta, pooled
+
+
+def _credible_interval(alpha, beta, level):
+    tail = (1 - level) / 2
+    if stats is not None:
+        return stats.beta.ppf(tail, alpha, beta), stats.beta.ppf(1 - tail, alpha, beta)
+    mean = alpha / (alpha + beta)
+    sd = np.sqrt(alpha * beta / ((alpha + beta) ** 2 * (alpha + beta + 1)))
+    z = {0.9: 1.6449, 0.95: 1.96, 0.99: 2.5758}.get(round(level, 2), 1.96)
+    return np.clip(mean - z * sd, 0, 1), np.clip(mean + z * sd, 0, 1)
+
+
+def reliability(df, by='Organisation', era=None, partial_weight=OUTCOME_WEIGHTS['Partial Failure'],
+                prior=None, level=0.95, dropempty=True):
+    """Beta-Binomial smoothed success rate for every `by` x era cell.
+
+    df     -- cleaned mission table (needs Mission_Status, the `by` columns and Year for eras)
+    by     -- column or list of columns, e.g. 'Organisation', 'ISO', 'Rocket_Status'
+    era    -- None, 'Year', 'Decade' or a bin width in years
+    prior  -- (alpha, beta) to use instead of the empirical-Bayes fit
+    level  -- width of the credible interval
+
+    Columns: Launches, Successes (weighted), Raw_Rate, Smoothed_Rate, Lower, Upper,
+    plus Alpha/Beta of the posterior. result.attrs holds the prior used and `pooled`, True
+    when the fit found no spread between cells (a RuntimeWarning is raised as well).
+    """
+    groups, eras, launches, successes = count_matrix(df, by, era, partial_weight)
+    if prior is None:
+        prior_alpha, prior_beta, pooled = _fitted_prior(launches, successes)
+    else:
+        (prior_alpha, prior_beta), pooled = prior, False
+
+    alpha = successes + prior_alpha
+    beta = launches - successes + prior_beta
+    lower, upper = _credible_interval(alpha, beta, level)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        raw = successes / launches
+
+    index = _cell_index(groups, eras) if era is not None else groups
+    result = pd.DataFrame({
+        'Launches': launches.ravel(),
+        'Successes': successes.ravel(),
+        'Raw_Rate': raw.ravel(),
+        'Smoothed_Rate': (alpha / (alpha + beta)).ravel(),
+        'Lower': np.asarray(lower).ravel(),
+        'Upper': np.asarray(upper).ravel(),
+        'Alpha': alpha.ravel(),
+        'Beta': beta.ravel(),
+    }, index=index)
+    if dropempty:
+        result = result[result['Launches'] > 0]
+    result.attrs.update(prior=(float(prior_alpha), float(prior_beta)), pooled=pooled)
+    return result
+
+
+def learning_curve(df, by='Organisation', partial_weight=OUTCOME_WEIGHTS['Partial Failure']):
+    """Per-group learning-curve fit: logit(success) against log(launch number).
+
+    Each group's launches are numbered in date order (its "experience") and a least-squares
+    line of the smoothed logit success rate on log experience is fitted for all groups at
+    once from grouped sums. A positive Slope means the group got more reliable as it flew
+    more.
+    """
+    ordered = df.sort_values('Date', kind='stable')
+    codes, groups = pd.factorize(ordered[by], sort=True)
+    keep = codes >= 0
+    codes = codes[keep]
+    weights = outcome_weights(ordered['Mission_Status'], partial_weight)[keep]
+
+    # launch number within each group, 1 based
+    experience = pd.Series(codes).groupby(codes).cumcount().to_numpy() + 1
+    x = np.log(experience)
+    # smoothed running success rate so the logit stays finite on a first failure
+    cumulative = pd.Series(weights).groupby(codes).cumsum().to_numpy()
+    rate = (cumulative + 0.5) / (experience + 1.0)
+    y = np.log(rate / (1 - rate))
+
+    k = len(groups)
+    n = np.bincount(codes, minlength=k).astype(float)
+    sx, sy = np.bincount(codes, x, k), np.bincount(codes, y, k)
+    sxx, sxy = np.bincount(codes, x * x, k), np.bincount(codes, x * y, k)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = (n * sxy - sx * sy) / (n * sxx - sx ** 2)
+        intercept = (sy - slope * sx) / n
+
+    return pd.DataFrame({
+        'Launches': n.astype(int),
+        'Slope': slope,
+        'Intercept': intercept,
+        # fitted success probability at the group's first and latest launch
+        'First_Rate': 1 / (1 + np.exp(-intercept)),
+        'Latest_Rate': 1 / (1 + np.exp(-(intercept + slope * np.log(np.maximum(n, 1))))),
+    }, index=pd.Index(groups, name=by))
+
+
+def _bootstrap_batch(seed, replicates, launches, probabilities, partial_weight,
+                     prior_alpha, prior_beta, refit):
+    # draws `replicates` resamples of every cell at once:
+    # outcome counts ~ Multinomial(n, [p_success, p_partial, p_failure])
+    rng = np.random.default_rng(seed)
+    draws = rng.multinomial(launches, probabilities, size=(replicates,) + launches.shape)
+    successes = draws[..., 0] + draws[..., 1] * partial_weight
+    if refit:
+        fits = np.array([fit_prior(launches, replicate) for replicate in successes])
+        shape = (-1,) + (1,) * launches.ndim
+        prior_alpha, prior_beta = fits[:, 0].reshape(shape), fits[:, 1].reshape(shape)
+    return (successes + prior_alpha) / (launches + prior_alpha + prior_beta)
+
+
+def bootstrap(df, by='Organisation', era=None, partial_weight=OUTCOME_WEIGHTS['Partial Failure'],
+              replicates=1000, level=0.95, prior=None, refit_prior=False, workers=None, seed=0):
+    """Bootstrap confidence intervals for the smoothed success rates.
+
+    Resamples every cell's outcomes from its own observed success / partial / failure mix
+    (parametric bootstrap on the count matrix, so no rows are copied) and re-scores it.
+    Replicates are split into batches that run in a thread pool; numpy's random
+    generators release the GIL while drawing. With refit_prior the empirical-Bayes prior
+    is refitted on every replicate too.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    groups, eras, cell = _cells(df, by, era)
+    shape = (len(groups), len(eras))
+    status = df['Mission_Status'].astype('string')
+    launches = _matrix(cell, None, shape)
+    full = _matrix(cell, (status == 'Success').fillna(False).to_numpy(float), shape)
+    partial = _matrix(cell, (status == 'Partial Failure').fillna(False).to_numpy(float), shape)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p_success = np.where(launches > 0, full / launches, 0.0)
+        p_partial = np.where(launches > 0, partial / launches, 0.0)
+    probabilities = np.stack([p_success, p_partial, np.clip(1 - p_success - p_partial, 0, 1)], axis=-1)
+
+    if prior is None:
+        prior = _fitted_prior(launches, full + partial * partial_weight)[:2]
+    prior_alpha, prior_beta = prior
+
+    workers = workers or min(8, os.cpu_count() or 1)
+    batches = [batch for batch in np.array_split(np.arange(replicates), workers) if len(batch)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda job: _bootstrap_batch(job[0], len(job[1]), launches, probabilities,
+                                                        partial_weight, prior_alpha, prior_beta,
+                                                        refit_prior),
+                           zip(seeds, batches))
+        samples = np.concatenate(list(results), axis=0)
+
+    tail = (1 - level) / 2
+    lower, upper = np.quantile(samples, [tail, 1 - tail], axis=0)
+
+    index = _cell_index(groups, eras) if era is not None else groups
+    result = pd.DataFrame({
+        'Launches': launches.ravel(),
+        'Boot_Mean': samples.mean(axis=0).ravel(),
+        'Boot_Lower': lower.ravel(),
+        'Boot_Upper': upper.ravel(),
+    }, index=index)
+    return result[result['Launches'] > 0]
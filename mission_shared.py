@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Sharing one cleaned mission table between many worker processes.
+#
+# The loader process cleans the data once (ISO, parsed Date, Year, Month, numeric Price),
+# packs it into a MissionStore and copies that into a multiprocessing.shared_memory block.
+# Workers attach read-only and get DataFrame views over the shared pages, so memory no
+# longer grows with the number of workers.
+#
+# Refreshes are published as a new block per generation. A tiny control block holds a
+# sequence number and the current generation (a seqlock): the publisher makes the
+# sequence odd while it writes and even again when done, readers retry if they see an
+# odd or moving sequence. Workers therefore switch from one complete table to the next,
+# never to a half written one.
+
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from mission_store import MissionStore
+
+
+# control block: int64 sequence number followed by int64 generation
+CONTROL = struct.Struct('<qq')
+SEQUENCE = struct.Struct('<q')
+
+
+def _block_name(name, generation):
+    return f"{name}-g{generation}"
+
+
+def _control_name(name):
+    return f"{name}-ctl"
+
+
+# before 3.13 attaching a block always registers it with the resource tracker, which
+# unlinks it when the tracker shuts down. That is harmless when the tracker is the
+# publisher's (same process, or a multiprocessing child that inherited it) but a tracker
+# started by an unrelated worker would remove the table when that worker exits.
+_tracker = getattr(resource_tracker, '_resource_tracker', None)
+_shares_publisher_tracker = getattr(_tracker, '_fd', None) is not None
+
+
+def _attach(block_name):
+    # attaching workers must not unlink the block when they exit, only the publisher owns it
+    try:
+        return shared_memory.SharedMemory(name=block_name, track=False)
+    except TypeError:  # Python < 3.13 has no track argument
+        block = shared_memory.SharedMemory(name=block_name)
+        if not _shares_publisher_tracker:
+            resource_tracker.unregister(block._name, 'shared_memory')
+        return block
+
+
+class SharedMissionPublisher:
+    """Loader side: owns the shared blocks and publishes new generations of the table."""
+
+    def __init__(self, name, keep=2):
+        global _shares_publisher_tracker
+        _shares_publisher_tracker = True
+        self.name = name
+        # older generations are kept around for a while so slow readers can finish attaching
+        self.keep = max(int(keep), 1)
+        self.generation = 0
+        self._blocks = {}
+        self._control = shared_memory.SharedMemory(name=_control_name(name), create=True, size=CONTROL.size)
+        CONTROL.pack_into(self._control.buf, 0, 0, 0)
+
+    def publish(self, df):
+        """Clean df (if needed), copy it into a new shared block and make it the current generation."""
+        store = df if isinstance(df, MissionStore) else MissionStore.from_frame(df)
+        generation = self.generation + 1
+
+        block = shared_memory.SharedMemory(name=_block_name(self.name, generation), create=True,
+                                           size=store.size_bytes)
+        store.write_into(np.ndarray((block.size,), dtype=np.uint8, buffer=block.buf))
+        self._blocks[generation] = block
+
+        sequence, _ = CONTROL.unpack_from(self._control.buf, 0)
+        SEQUENCE.pack_into(self._control.buf, 0, sequence + 1)
+        CONTROL.pack_into(self._control.buf, 0, sequence + 1, generation)
+        SEQUENCE.pack_into(self._control.buf, 0, sequence + 2)
+        self.generation = generation
+
+        for old in sorted(self._blocks)[:-self.keep]:
+            self._release(old)
+        return generation
+
+    def _release(self, generation):
+        block = self._blocks.pop(generation)
+        block.close()
+        block.unlink()
+
+    def close(self):
+        """Unlink every block; workers already attached keep their mappings until they close."""
+        for generation in list(self._blocks):
+            self._release(generation)
+        self._control.close()
+        self._control.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SharedMissionReader:
+    """Worker side: attaches to the current generation read-only and rebuilds DataFrame views."""
+
+    def __init__(self, name, retries=100):
+        self.name = name
+        self.retries = retries
+        self.generation = 0
+        self.store = None
+        self._block = None
+        self._control = _attach(_control_name(name))
+
+    def current_generation(self):
+        """Generation the publisher has most recently finished writing (0 if none yet)."""
+        for _ in range(self.retries):
+            before, generation = CONTROL.unpack_from(self._control.buf, 0)
+            (after,) = SEQUENCE.unpack_from(self._control.buf, 0)
+            if before == after and before % 2 == 0:
+                return generation
+            time.sleep(0)
+        raise TimeoutError(f"Shared mission table {self.name!r} is being rewritten, try again")
+
+    def refresh(self):
+        """Switch to the newest generation if there is one; returns True when it changed."""
+        for _ in range(self.retries):
+            generation = self.current_generation()
+            if generation in (0, self.generation):
+                return False
+            try:
+                block = _attach(_block_name(self.name, generation))
+            except FileNotFoundError:
+                # the publisher moved on and released it in the meantime, look again
+                continue
+
+            buffer = np.ndarray((block.size,), dtype=np.uint8, buffer=block.buf)
+            buffer.flags.writeable = False
+            store = MissionStore.from_buffer(buffer)
+
+            self._detach()
+            self._block, self.store, self.generation = block, store, generation
+            return True
+        raise TimeoutError(f"Could not attach to shared mission table {self.name!r}")
+
+    def frame(self, columns=None):
+        """DataFrame view of the latest generation, without copying the shared arrays."""
+        self.refresh()
+        if self.store is None:
+            raise LookupError(f"Nothing has been published to {self.name!r} yet")
+        return self.store.to_frame(columns)
+
+    def _detach(self):
+        if self._block is not None:
+            self.store = None
+            try:
+                self._block.close()
+            except BufferError:
+                # DataFrames handed out earlier still point into the block, the mapping
+                # is freed once they are garbage collected
+                pass
+            self._block = None
+
+    def close(self):
+        self._detach()
+        self._control.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Launch-site level geography.
+#
+# get_iso only keeps the last comma separated part of Location, which is why the maps in
+# the notebook stop at country level. Location usually reads "pad, site, region, country",
+# e.g. "LC-39A, Kennedy Space Center, Florida, USA". This module splits it into those
+# parts, looks the site up in the bundled launch_sites.csv table (approximate coordinates,
+# no network needed) and builds a small grid index over the sites for nearest-site and
+# bounding-box queries. site_summary aggregates missions per site once, so a site map
+# plots one marker per site instead of one per launch.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from mission_cleaning import get_iso
+
+
+SITES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'launch_sites.csv')
+EARTH_RADIUS_KM = 6371.0
+LOCATION_PARTS = ['Pad', 'Site', 'Region', 'Country']
+
+
+def load_sites(path=SITES_PATH):
+    """The offline site table: Match, Site, Country, ISO, Latitude, Longitude."""
+    sites = pd.read_csv(path, keep_default_na=False, na_values={'Latitude': [''], 'Longitude': ['']})
+    sites['ISO'] = sites['ISO'].replace('', np.nan)
+    return sites
+
+
+def _split_location(location, site_names):
+    parts = [part.strip() for part in str(location).split(',') if part.strip()]
+    pad = region = country = None
+
+    # if a known site name appears in one of the parts, everything before it is the pad
+    # and everything between it and the country is the region
+    position = next((index for index, part in enumerate(parts)
+                     if any(name in part for name in site_names)), None)
+
+    if position is None:
+        if len(parts) >= 3:
+            position = 1
+        elif len(parts) == 2:
+            position = 0 if get_iso(parts[-1]) else 1
+        else:
+            position = 0
+
+    site = parts[position] if parts else None
+    if position > 0:
+        pad = ', '.join(parts[:position])
+    rest = parts[position + 1:]
+    if rest:
+        country = rest[-1]
+        region = ', '.join(rest[:-1]) or None
+    return pad, site, region, country
+
+
+def parse_locations(locations, sites=None):
+    """Split Location strings into Pad / Site / Region / Country plus the matched site row.
+
+    Only the distinct locations are parsed. Adds ISO, Latitude and Longitude from the site
+    table (falling back to get_iso when the site isn't in the table).
+    """
+    sites = load_sites() if sites is None else sites
+    locations = pd.Series(locations)
+    codes, uniques = pd.factorize(locations)
+
+    match_names = sites['Match'].tolist()
+    rows = []
+    for location in uniques:
+        pad, site, region, country = _split_location(location, match_names)
+        # the longest matching name wins, e.g. Kennedy Space Center over a shorter alias
+        matches = [index for index, name in enumerate(match_names) if name in location]
+        known = max(matches, key=lambda index: len(match_names[index])) if matches else None
+        if known is not None:
+            row = sites.iloc[known]
+            # missing ISOs come back as NaN (truthy), so test with isna rather than `or`
+            iso = get_iso(location) if pd.isna(row['ISO']) else row['ISO']
+            rows.append((pad, row['Site'], region, country or row['Country'],
+                         iso, row['Latitude'], row['Longitude']))
+        else:
+            rows.append((pad, site, region, country, get_iso(location), np.nan, np.nan))
+
+    columns = LOCATION_PARTS + ['ISO', 'Latitude', 'Longitude']
+    table = pd.DataFrame(rows + [(None,) * 4 + (None, np.nan, np.nan)], columns=columns)
+    # factorize marks missing locations with -1, which picks the all-missing last row
+    parsed = table.iloc[codes].reset_index(drop=True)
+    parsed.index = locations.index
+    return parsed
+
+
+def _haversine(lat, lon, lats, lons):
+    lat, lon, lats, lons = map(np.radians, (lat, lon, lats, lons))
+    a = (np.sin((lats - lat) / 2) ** 2
+         + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class SiteIndex:
+    """Uniform lat/lon grid over site coordinates.
+
+    Sites are sorted by grid cell so a bounding box only looks at the cells it covers,
+    and nearest() searches outwards ring by ring instead of measuring every site.
+    """
+
+    def __init__(self, sites, cell_degrees=5.0):
+        sites = sites.dropna(subset=['Latitude', 'Longitude'])
+        self.cell_degrees = float(cell_degrees)
+        self.n_lat = int(np.ceil(180 / self.cell_degrees))
+        self.n_lon = int(np.ceil(360 / self.cell_degrees))
+
+        cells = self._cells(sites['Latitude'].to_numpy(), sites['Longitude'].to_numpy())
+        order = np.argsort(cells, kind='stable')
+        self.sites = sites.iloc[order].reset_index(drop=True)
+        self.lat = self.sites['Latitude'].to_numpy(float)
+        self.lon = self.sites['Longitude'].to_numpy(float)
+        self.cells = cells[order]
+
+    def _rows_cols(self, lat, lon):
+        row = np.clip(((np.asarray(lat) + 90) // self.cell_degrees).astype(int), 0, self.n_lat - 1)
+        col = ((np.asarray(lon) + 180) // self.cell_degrees).astype(int) % self.n_lon
+        return row, col
+
+    def _cells(self, lat, lon):
+        row, col = self._rows_cols(lat, lon)
+        return row * self.n_lon + col
+
+    def _in_cells(self, rows, cols):
+        # positions of all sites whose cell is in rows x cols
+        wanted = (np.asarray(rows)[:, None] * self.n_lon + np.asarray(cols)[None, :]).ravel()
+        starts = np.searchsorted(self.cells, wanted, side='left')
+        stops = np.searchsorted(self.cells, wanted, side='right')
+        if not len(wanted):
+            return np.empty(0, dtype=int)
+        return np.concatenate([np.arange(start, stop) for start, stop in zip(starts, stops)])
+
+    def within(self, lat_min, lat_max, lon_min, lon_max):
+        """Sites inside a bounding box (lon_min > lon_max means the box crosses 180 degrees)."""
+        row_min, col_min = self._rows_cols(lat_min, lon_min)
+        row_max, col_max = self._rows_cols(lat_max, lon_max)
+        rows = np.arange(row_min, row_max + 1)
+        if col_min <= col_max and lon_min <= lon_max:
+            cols = np.arange(col_min, col_max + 1)
+        else:
+            cols = np.concatenate([np.arange(col_min, self.n_lon), np.arange(0, col_max + 1)])
+
+        candidates = self._in_cells(rows, cols)
+        lat, lon = self.lat[candidates], self.lon[candidates]
+        inside_lon = ((lon >= lon_min) & (lon <= lon_max)) if lon_min <= lon_max \
+            else ((lon >= lon_min) | (lon <= lon_max))
+        keep = candidates[(lat >= lat_min) & (lat <= lat_max) & inside_lon]
+        return self.sites.iloc[np.sort(keep)]
+
+    def nearest(self, lat, lon, k=1):
+        """The k closest sites to a point, with a Distance_km column."""
+        k = min(int(k), len(self.sites))
+        if k <= 0:
+            return self.sites.iloc[:0].assign(Distance_km=[])
+        row, col = self._rows_cols(lat, lon)
+        # a grid cell is at most cell_degrees of latitude tall, so anything outside ring r
+        # is at least r cells of latitude away - stop once the k-th candidate is closer
+        cell_km = np.radians(self.cell_degrees) * EARTH_RADIUS_KM
+        for ring in range(max(self.n_lat, self.n_lon)):
+            rows = np.arange(max(row - ring, 0), min(row + ring, self.n_lat - 1) + 1)
+            cols = np.arange(col - ring, col + ring + 1) % self.n_lon
+            candidates = np.unique(self._in_cells(rows, np.unique(cols)))
+            if len(candidates) >= k:
+                distance = _haversine(lat, lon, self.lat[candidates], self.lon[candidates])
+                order = np.argsort(distance)[:k]
+                if distance[order[-1]] <= ring * cell_km or len(candidates) == len(self.sites):
+                    break
+        # rings only bound the search by latitude, so finish with an exact check over the
+        # grid cells inside the circle reaching the k-th best candidate found so far
+        close = self._in_radius(lat, lon, distance[order[-1]])
+        distance = _haversine(lat, lon, self.lat[close], self.lon[close])
+        order = np.argsort(distance, kind='stable')[:k]
+        return self.sites.iloc[close[order]].assign(Distance_km=distance[order])
+
+    def _in_radius(self, lat, lon, radius_km):
+        # positions of the sites in cells overlapping the lat/lon box around a circle of
+        # radius_km; longitude span widens with latitude, and covers everything at a pole
+        angle = radius_km / EARTH_RADIUS_KM
+        margin = 1e-9
+        lat_min, lat_max = lat - np.degrees(angle) - margin, lat + np.degrees(angle) + margin
+        row_min, _ = self._rows_cols(max(lat_min, -90.0), lon)
+        row_max, _ = self._rows_cols(min(lat_max, 90.0), lon)
+        rows = np.arange(row_min, row_max + 1)
+
+        if lat_min <= -90 or lat_max >= 90 or np.sin(angle) >= np.cos(np.radians(lat)):
+            cols = np.arange(self.n_lon)
+        else:
+            half_width = np.degrees(np.arcsin(np.sin(angle) / np.cos(np.radians(lat)))) + margin
+            _, col_min = self._rows_cols(lat, lon - half_width)
+            _, col_max = self._rows_cols(lat, lon + half_width)
+            span = (col_max - col_min) % self.n_lon + 1
+            cols = np.arange(self.n_lon) if 2 * half_width + self.cell_degrees >= 360 \
+                else (col_min + np.arange(span)) % self.n_lon
+        return self._in_cells(rows, cols)
+
+
+def site_summary(df, sites=None):
+    """One row per launch site: coordinates, country and launch / success / failure counts."""
+    sites = load_sites() if sites is None else sites
+    parsed = parse_locations(df['Location'], sites)
+    status = df['Mission_Status'].astype('string')
+    missions = pd.DataFrame({
+        'Site': parsed['Site'],
+        'ISO': parsed['ISO'],
+        'Latitude': parsed['Latitude'],
+        'Longitude': parsed['Longitude'],
+        'Success': (status == 'Success').to_numpy(),
+        'Organisation': df['Organisation'].astype('string').to_numpy(),
+    })
+    if 'Year' in df:
+        missions['Year'] = df['Year'].to_numpy()
+
+    aggregations = {
+        'Launches': ('Success', 'size'),
+        'Successes': ('Success', 'sum'),
+        'Organisations': ('Organisation', 'nunique'),
+        'Latitude': ('Latitude', 'first'),
+        'Longitude': ('Longitude', 'first'),
+    }
+    if 'Year' in missions:
+        aggregations['First_Year'] = ('Year', 'min')
+        aggregations['Last_Year'] = ('Year', 'max')
+    summary = missions.groupby(['Site', 'ISO'], dropna=False, sort=True).agg(**aggregations).reset_index()
+    summary['Failures'] = summary['Launches'] - summary['Successes']
+    return summary.sort_values('Launches', ascending=False, ignore_index=True)
+
+
+def site_map(summary, title='Launches by Launch Site'):
+    """Scatter-geo map of site_summary output, one marker per site sized by launches."""
+    import plotly.express as px
+
+    return px.scatter_geo(summary.dropna(subset=['Latitude', 'Longitude']),
+                          lat='Latitude',
+                          lon='Longitude',
+                          size='Launches',
+                          color='ISO',
+                          hover_name='Site',
+                          hover_data={'Launches': True, 'Successes': True, 'Failures': True},
+                          projection='natural earth',
+                          title=title)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Golden-output regression harness for the notebook's aggregates.
+#
+# Speeding up get_iso, date_process, the price conversion or the groupbys must not change
+# a single number in the analysis. This module recomputes every aggregate the notebook
+# builds, stores them as one small gzipped JSON snapshot (a digest per aggregate plus the
+# canonicalised table) and diffs later runs against it. Each aggregate is timed too, so
+# the same run doubles as a benchmark:
+#
+#   python mission_snapshots.py record mission_launches.csv golden.json.gz
+#   python mission_snapshots.py check mission_launches.csv golden.json.gz
+#   python mission_snapshots.py check mission_launches.csv golden.json.gz --prepare vectorised
+#
+# `--prepare notebook` cleans the data exactly like the notebook (row by row apply);
+# `--prepare vectorised` uses mission_cleaning instead. Both have to match the snapshot.
+
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from mission_cleaning import clean_missions, get_iso
+
+
+# number of decimals floats are compared at, so a different summation order is not a diff
+FLOAT_DECIMALS = 6
+MAX_DIFF_ROWS = 10
+
+
+# # Preparing the data
+
+def date_process(x):
+    # the notebook's per-value date parser, kept verbatim as the reference
+    only_date_format = "%a %b %d, %Y"
+
+    try:
+        return pd.to_datetime(x, utc = True)
+
+    # For values with date-only, we will handle this exception.
+    except ValueError:
+        return pd.to_datetime(x, format = only_date_format, utc = True)
+
+
+def prepare_notebook(df_raw):
+    """df_data / df_data_clean exactly as the notebook builds them."""
+    df_data = df_raw.copy()
+    df_data_clean = df_data.dropna().copy()
+
+    df_data['ISO'] = df_data['Location'].apply(get_iso)
+
+    df_data_clean['Price'] = df_data_clean['Price'].str.replace(',','').astype(float)
+
+    df_data['Date'] = df_data['Date'].apply(date_process)
+    df_data_clean['Date'] = df_data_clean['Date'].apply(date_process)
+
+    dates = pd.DatetimeIndex(data=df_data.Date)
+    df_data.insert(5, 'Year', dates.year)
+    df_data.insert(6, 'Month', dates.month)
+    return df_data, df_data_clean
+
+
+def prepare_vectorised(df_raw):
+    """Same two tables, cleaned with the vectorised mission_cleaning functions."""
+    df_data = clean_missions(df_raw, categorical=False)
+    df_data_clean = clean_missions(df_raw.dropna(), categorical=False).drop(columns=['ISO', 'Year', 'Month'])
+
+    # the notebook puts Year/Month after Date
+    columns = [column for column in df_data.columns if column not in ('Year', 'Month')]
+    columns[5:5] = ['Year', 'Month']
+    return df_data[columns], df_data_clean
+
+
+PREPARES = {
+    'notebook': prepare_notebook,
+    'vectorised': prepare_vectorised,
+}
+
+
+# # The aggregates, same code as the notebook
+
+def _launches_sorted(df_data):
+    top_10_orgs = df_data['Organisation'].value_counts().nlargest(10).index
+    filtered_df = df_data[df_data['Organisation'].isin(top_10_orgs)]
+    return filtered_df.groupby([filtered_df['Date'].dt.year, 'Organisation']).size().reset_index(name= 'Launches')
+
+
+def _launch_counts(df_data):
+    launches_ordered = df_data.sort_values(by='Date')
+    launch_counts = launches_ordered.groupby(['Year','Month']).size().reset_index(name = 'Launches')
+    launch_counts['Date'] = pd.to_datetime(launch_counts['Year'].astype(str) + '-' + launch_counts['Month'].astype(str))
+    launch_counts['Roll_avg_launches']= launch_counts.Launches.rolling(window = 6).mean()
+    return launch_counts
+
+
+def _years_sorted(df_data):
+    years_sorted = df_data[df_data['Year'] < 1991 ].sort_values(by='Date')
+    years_sorted['ISO'] = years_sorted['ISO'].replace({'KAZ': 'RUS'})
+    years_sorted = years_sorted.loc[years_sorted['ISO'].isin(['USA', 'RUS'])]
+    return years_sorted.groupby(['Year', 'ISO']).size().reset_index(name= 'Launches')
+
+
+def _failures(df_data):
+    failures = df_data.loc[df_data['Mission_Status'] != 'Success'].groupby(['ISO'], as_index = False).agg({'Mission_Status':pd.Series.count})
+    return failures.rename(columns={'Mission_Status':'Failures'})
+
+
+def _failures_yoy(df_data):
+    failures_df = df_data[df_data['Mission_Status'] != 'Success']
+    return failures_df.groupby(['Year'], as_index = False).size()
+
+
+def _lead_org_df(df_data):
+    iso_yearly = df_data.groupby(['Year', 'ISO']).size().reset_index(name = 'Launches')
+    iso_yearly['ISO'] = iso_yearly['ISO'].replace({'KAZ':'RUS'})
+    return iso_yearly.loc[iso_yearly.groupby('Year')['Launches'].idxmax()]
+
+
+def _country_success(df_data):
+    success_df = df_data[df_data['Mission_Status'] == 'Success'].sort_values(by='Year')
+    country_success = success_df.groupby(['Year', 'ISO']).size().reset_index(name = 'Launches')
+    country_success['ISO'] = country_success['ISO'].replace({'KAZ':'RUS'})
+    return country_success.loc[country_success.groupby('Year')['Launches'].idxmax()]
+
+
+def _winning_org(df_data):
+    launches_sorted = _launches_sorted(df_data)
+    return launches_sorted.loc[launches_sorted.groupby('Date')['Launches'].idxmax()]
+
+
+# name -> function(df_data, df_data_clean)
+AGGREGATES = {
+    'launches_by_org': lambda df_data, df_data_clean: df_data.Organisation.value_counts(),
+    'status': lambda df_data, df_data_clean: df_data.Rocket_Status.value_counts(),
+    'launches_by_country': lambda df_data, df_data_clean: df_data.ISO.value_counts().reset_index(),
+    'failures': lambda df_data, df_data_clean: _failures(df_data),
+    'iso_status': lambda df_data, df_data_clean:
+        df_data.groupby(['ISO', 'Organisation', 'Mission_Status']).size().reset_index(name='counts'),
+    'money_spent_per_org': lambda df_data, df_data_clean:
+        df_data_clean.groupby(['Organisation'], as_index = False).agg({'Price': pd.Series.sum}),
+    'org_avg_spend': lambda df_data, df_data_clean:
+        df_data_clean.groupby(['Organisation'], as_index = False).agg({'Price': pd.Series.mean}),
+    'launch_counts': lambda df_data, df_data_clean: _launch_counts(df_data),
+    'launches_sorted': lambda df_data, df_data_clean: _launches_sorted(df_data),
+    'years_sorted': lambda df_data, df_data_clean: _years_sorted(df_data),
+    'failures_yoy': lambda df_data, df_data_clean: _failures_yoy(df_data),
+    'lead_org_df': lambda df_data, df_data_clean: _lead_org_df(df_data),
+    'country_success': lambda df_data, df_data_clean: _country_success(df_data),
+    'winning_org': lambda df_data, df_data_clean: _winning_org(df_data),
+}
+
+
+def compute_aggregates(df_raw, prepare='notebook', aggregates=AGGREGATES):
+    """Run the preparation and every aggregate; returns (results, timings in seconds)."""
+    prepare = PREPARES[prepare] if isinstance(prepare, str) else prepare
+    timings = {}
+
+    start = time.perf_counter()
+    df_data, df_data_clean = prepare(df_raw)
+    timings['prepare'] = time.perf_counter() - start
+
+    results = {}
+    for name, aggregate in aggregates.items():
+        start = time.perf_counter()
+        results[name] = aggregate(df_data, df_data_clean)
+        timings[name] = time.perf_counter() - start
+    return results, timings
+
+
+# # Snapshots
+
+def canonical(result):
+    """Aggregate -> plain DataFrame of JSON friendly values, index kept as columns.
+
+    Row order is kept (value_counts order is part of the output); dtypes are not, so an
+    int32 vs int64 Year or datetime64[us] vs [ns] is not reported as a change.
+    """
+    if isinstance(result, pd.Series):
+        result = result.to_frame(name=result.name if result.name is not None else 'value')
+    frame = result.reset_index()
+    frame.columns = [str(column) for column in frame.columns]
+
+    out = {}
+    for column in frame.columns:
+        series = frame[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = pd.to_datetime(series, utc=True).dt.strftime('%Y-%m-%dT%H:%M:%S').astype(object)
+        elif pd.api.types.is_bool_dtype(series):
+            values = series.astype(object)
+        elif pd.api.types.is_integer_dtype(series):
+            values = series.astype(object)
+        elif pd.api.types.is_float_dtype(series):
+            values = series.round(FLOAT_DECIMALS).astype(object)
+        else:
+            values = series.astype(object)
+        out[column] = values.where(pd.notna(values), None).map(_plain)
+    return pd.DataFrame(out, columns=frame.columns)
+
+
+def _plain(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        # 3.0 and 3 are the same count, whatever dtype produced it
+        return int(value)
+    return value
+
+
+def _payload(frame):
+    return {'columns': list(frame.columns), 'data': frame.to_numpy().tolist()}
+
+
+def _digest(payload):
+    text = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def snapshot(results):
+    """Snapshot dict {name: {'digest', 'shape', 'columns', 'data'}} of computed aggregates."""
+    snap = {}
+    for name, result in results.items():
+        payload = _payload(canonical(result))
+        snap[name] = dict(payload, digest=_digest(payload), shape=[len(payload['data']), len(payload['columns'])])
+    return snap
+
+
+def save_snapshot(snap, path):
+    with gzip.open(path, 'wt', encoding='utf-8') as handle:
+        json.dump(snap, handle, separators=(',', ':'), default=str)
+
+
+def load_snapshot(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def diff(golden, current, max_rows=MAX_DIFF_ROWS):
+    """Differences between two snapshots as {name: message}; empty when they match.
+
+    Digests are compared first, tables are only unpacked for aggregates that differ.
+    """
+    problems = {}
+    for name in sorted(set(golden) | set(current)):
+        if name not in current:
+            problems[name] = 'missing from the current run'
+            continue
+        if name not in golden:
+            problems[name] = 'not in the golden snapshot'
+            continue
+        if golden[name]['digest'] == current[name]['digest']:
+            continue
+
+        old, new = golden[name], current[name]
+        if old['columns'] != new['columns']:
+            problems[name] = f"columns changed: {old['columns']} -> {new['columns']}"
+        elif old['shape'] != new['shape']:
+            problems[name] = f"shape changed: {tuple(old['shape'])} -> {tuple(new['shape'])}"
+        else:
+            before = pd.DataFrame(old['data'], columns=old['columns'])
+            after = pd.DataFrame(new['data'], columns=new['columns'])
+            changed = before.astype(str).ne(after.astype(str)).any(axis=1)
+            rows = [f"  row {row}: {before.iloc[row].to_dict()} -> {after.iloc[row].to_dict()}"
+                    for row in np.flatnonzero(changed.to_numpy())[:max_rows]]
+            problems[name] = f"{int(changed.sum())} row(s) changed\n" + '\n'.join(rows)
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__ or 'Golden snapshots of the notebook aggregates')
+    parser.add_argument('command', choices=['record', 'check'])
+    parser.add_argument('csv', help='mission_launches.csv')
+    parser.add_argument('snapshot', help='golden snapshot file (.json.gz)')
+    parser.add_argument('--prepare', choices=sorted(PREPARES), default='notebook')
+    args = parser.parse_args(argv)
+
+    results, timings = compute_aggregates(pd.read_csv(args.csv), args.prepare)
+    current = snapshot(results)
+
+    for name, seconds in timings.items():
+        print(f"{name:<22}{seconds * 1000:>10.1f} ms")
+    print(f"{'total':<22}{sum(timings.values()) * 1000:>10.1f} ms")
+
+    if args.command == 'record':
+        save_snapshot(current, args.snapshot)
+        print(f"Recorded {len(current)} aggregates to {args.snapshot}")
+        return 0
+
+    problems = diff(load_snapshot(args.snapshot), current)
+    for name, message in problems.items():
+        print(f"DIFF {name}: {message}")
+    print('All aggregates match the golden snapshot.' if not problems else f"{len(problems)} aggregate(s) differ.")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
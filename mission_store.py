@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Compact column store for the mission table.
+#
+# A DataFrame of Python strings costs a PyObject per cell in every process that holds it.
+# MissionStore keeps each label column (Organisation, Location, Detail, Rocket_Status,
+# Mission_Status, ISO) as a small integer code array plus one interned copy of every
+# distinct string, Date as int64 nanoseconds since the epoch (UTC), Year/Month as small
+# ints and Price as float64. The whole thing saves to a single file that can be opened
+# with np.memmap, so many worker processes can share the same pages read-only.
+#
+# File layout: 8 byte magic, 8 byte little-endian header length, a JSON header describing
+# the columns, then every array aligned to 64 bytes.
+
+import json
+import struct
+import sys
+
+import numpy as np
+import pandas as pd
+
+from mission_cleaning import LABEL_COLUMNS, clean_missions
+
+
+MAGIC = b'MSNSTOR1'
+ALIGNMENT = 64
+
+# code arrays use -1 for missing, Date uses the NaT sentinel
+NAT = np.iinfo(np.int64).min
+MISSING_CODE = -1
+
+LABELS = 'label'
+DATES = 'date'
+VALUES = 'value'
+
+
+def _code_dtype(n_categories):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _utc_dates(array):
+    # tz-aware view over the int64 ns array; tz_localize would copy it, so wrap the
+    # buffer directly and only fall back to the copy if pandas lacks the constructor
+    values = array.view('datetime64[ns]')
+    try:
+        return pd.arrays.DatetimeArray._simple_new(values, dtype=pd.DatetimeTZDtype('ns', 'UTC'))
+    except (AttributeError, TypeError):
+        return pd.DatetimeIndex(values).tz_localize('UTC').array
+
+
+class MissionStore:
+    """Column arrays for the cleaned mission table, see the module comment for the layout."""
+
+    def __init__(self, n_rows, arrays, categories, kinds):
+        self.n_rows = n_rows
+        # column name -> numpy array (codes for labels, int64 ns for Date)
+        self.arrays = arrays
+        # label column name -> list of distinct strings, position = code
+        self.categories = categories
+        self.kinds = kinds
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def columns(self):
+        return list(self.arrays)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.arrays.values())
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build a store from a raw or cleaned mission DataFrame."""
+        if 'Date' in df and not pd.api.types.is_datetime64_any_dtype(df['Date']):
+            df = clean_missions(df)
+
+        arrays, categories, kinds = {}, {}, {}
+        for column in df.columns:
+            series = df[column]
+            name = str(column)
+            if column in LABEL_COLUMNS or column == 'ISO' or not (
+                    pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series)):
+                codes, uniques = pd.factorize(series.astype(object), use_na_sentinel=True)
+                arrays[name] = codes.astype(_code_dtype(len(uniques)))
+                categories[name] = [sys.intern(str(value)) for value in uniques]
+                kinds[name] = LABELS
+            elif pd.api.types.is_datetime64_any_dtype(series):
+                dates = pd.to_datetime(series, utc=True).dt.tz_convert(None)
+                arrays[name] = dates.to_numpy('datetime64[ns]').view(np.int64)
+                kinds[name] = DATES
+            elif column == 'Year':
+                # 0 stands in for a missing year/month
+                arrays[name] = series.fillna(0).to_numpy(np.int16)
+                kinds[name] = VALUES
+            elif column == 'Month':
+                arrays[name] = series.fillna(0).to_numpy(np.int8)
+                kinds[name] = VALUES
+            else:
+                if series.isna().any():
+                    arrays[name] = series.to_numpy(np.float64, na_value=np.nan)
+                else:
+                    arrays[name] = series.to_numpy()
+                kinds[name] = VALUES
+        return cls(len(df), arrays, categories, kinds)
+
+    def codes(self, column):
+        """Raw integer codes of a label column, -1 where missing."""
+        return self.arrays[column]
+
+    def column(self, column):
+        """One column as a pandas Series backed by the store's array."""
+        array = self.arrays[column]
+        kind = self.kinds[column]
+        if kind == LABELS:
+            values = pd.Categorical.from_codes(array, categories=pd.Index(self.categories[column], dtype=object),
+                                               validate=False)
+        elif kind == DATES:
+            values = _utc_dates(array)
+        else:
+            values = array
+        return pd.Series(values, name=column, copy=False)
+
+    def to_frame(self, columns=None):
+        """DataFrame view of the store; label columns come back as categoricals."""
+        columns = self.columns if columns is None else list(columns)
+        return pd.DataFrame({column: self.column(column) for column in columns}, copy=False)
+
+    def _layout(self):
+        layout = []
+        offset = 0
+        for name, array in self.arrays.items():
+            layout.append({'name': name, 'kind': self.kinds[name], 'dtype': array.dtype.str,
+                           'offset': offset, 'length': len(array),
+                           'categories': self.categories.get(name)})
+            offset = _aligned(offset + array.nbytes)
+
+        header = json.dumps({'n_rows': self.n_rows, 'columns': layout}).encode('utf-8')
+        data_start = _aligned(len(MAGIC) + 8 + len(header))
+        return header, layout, data_start, data_start + offset
+
+    @property
+    def size_bytes(self):
+        """Size of the serialised store, e.g. for sizing a shared memory block."""
+        return self._layout()[3]
+
+    def write_into(self, buffer):
+        """Serialise the store into a writable uint8 buffer at least size_bytes long."""
+        header, layout, data_start, size = self._layout()
+        buffer = np.frombuffer(buffer, dtype=np.uint8) if not isinstance(buffer, np.ndarray) else buffer
+        if len(buffer) < size:
+            raise ValueError(f"Buffer of {len(buffer)} bytes is too small for a {size} byte store")
+
+        buffer[:len(MAGIC)] = np.frombuffer(MAGIC, dtype=np.uint8)
+        buffer[len(MAGIC):len(MAGIC) + 8] = np.frombuffer(struct.pack('<Q', len(header)), dtype=np.uint8)
+        buffer[len(MAGIC) + 8:len(MAGIC) + 8 + len(header)] = np.frombuffer(header, dtype=np.uint8)
+        for entry, array in zip(layout, self.arrays.values()):
+            start = data_start + entry['offset']
+            buffer[start:start + array.nbytes] = np.ascontiguousarray(array).view(np.uint8)
+        return size
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """Store whose arrays are views into a serialised buffer (bytes, mmap, shared memory ...)."""
+        buffer = np.frombuffer(buffer, dtype=np.uint8) if not isinstance(buffer, np.ndarray) else buffer
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Buffer does not hold a mission store")
+        (header_length,) = struct.unpack('<Q', bytes(buffer[len(MAGIC):len(MAGIC) + 8]))
+        header = json.loads(bytes(buffer[len(MAGIC) + 8:len(MAGIC) + 8 + header_length]).decode('utf-8'))
+        data_start = _aligned(len(MAGIC) + 8 + header_length)
+
+        arrays, categories, kinds = {}, {}, {}
+        for entry in header['columns']:
+            dtype = np.dtype(entry['dtype'])
+            start = data_start + entry['offset']
+            stop = start + entry['length'] * dtype.itemsize
+            arrays[entry['name']] = buffer[start:stop].view(dtype)
+            kinds[entry['name']] = entry['kind']
+            if entry['categories'] is not None:
+                categories[entry['name']] = [sys.intern(value) for value in entry['categories']]
+        return cls(header['n_rows'], arrays, categories, kinds)
+
+    def save(self, path):
+        buffer = np.memmap(path, dtype=np.uint8, mode='w+', shape=self.size_bytes)
+        self.write_into(buffer)
+        buffer.flush()
+        del buffer
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Open a saved store; with mmap=True the arrays are read-only views of the file."""
+        if mmap:
+            return cls.from_buffer(np.memmap(path, dtype=np.uint8, mode='r'))
+        return cls.from_buffer(np.fromfile(path, dtype=np.uint8))
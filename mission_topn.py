@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Top-N over time for any dimension.
+#
+# The notebook's top-10 chart is value_counts().nlargest(10) on Organisation, an isin()
+# filter over the whole frame and another groupby by year. top_n_over_time does the same
+# for Organisation, ISO, Site (launch site from mission_sites) or Rocket_Status, over all
+# time, per decade or a rolling window of years, from one dense key x year count matrix.
+#
+#   top_n_over_time(df_data, 'Organisation', n=10)               # launches_sorted
+#   top_n_over_time(df_data, 'ISO', n=5, window='decade')
+#   top_n_over_time(df_data, 'Site', n=10, window=5)             # rolling 5 years
+#
+# When the input is a stream too big to count exactly per key, SpaceSaving keeps a fixed
+# number of counters and still finds every key above 1/capacity of the total.
+
+import heapq
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+DIMENSIONS = ['Organisation', 'ISO', 'Site', 'Rocket_Status']
+
+
+def _labels(df, dimension):
+    if dimension in df:
+        return df[dimension]
+    if dimension == 'Site':
+        from mission_sites import parse_locations
+        return parse_locations(df['Location'])['Site']
+    if dimension == 'ISO':
+        from mission_cleaning import iso_codes
+        return iso_codes(df['Location'])
+    raise KeyError(f"{dimension!r} is not a column and can't be derived")
+
+
+def year_matrix(df, dimension):
+    """Dense (keys x years) launch counts.
+
+    Keys are in order of first appearance, which is how value_counts breaks ties, so
+    rankings agree with the notebook's nlargest.
+    """
+    codes, keys = pd.factorize(pd.Series(_labels(df, dimension)).astype(object), sort=False)
+    year = pd.array(df['Year'], dtype='Int64')
+    known = (codes >= 0) & ~pd.isna(year)
+    year = np.asarray(year[known], dtype=np.int64)
+    years = np.arange(year.min(), year.max() + 1) if len(year) else np.empty(0, dtype=np.int64)
+
+    cell = codes[known] * len(years) + (year - (years[0] if len(years) else 0))
+    counts = np.bincount(cell, minlength=len(keys) * len(years)).reshape(len(keys), len(years))
+    return pd.Index(keys, name=dimension), pd.Index(years, name='Year'), counts
+
+
+def _top(values, n):
+    # column indices of the n largest values per row, ties to the earlier key
+    order = np.argsort(-values, axis=-1, kind='stable')
+    return order[..., :n]
+
+
+def top_n_over_time(df, dimension='Organisation', n=10, window='all', dropzero=True):
+    """Launches per year (or window) for the top `n` keys of a dimension.
+
+    window -- 'all':    the all-time top n, with their launches in every year
+              'decade': the top n within each decade
+              int k:    for every year, the top n by launches in the k years up to it
+
+    Returns a long DataFrame: Year (or Decade), the dimension, Launches and Rank (1 = most).
+    """
+    keys, years, counts = year_matrix(df, dimension)
+    n = min(n, len(keys))
+
+    if window == 'all':
+        top = _top(counts.sum(axis=1), n)
+        table = pd.DataFrame(counts[top].T, index=years, columns=keys[top])
+        ranks = pd.Series(np.arange(1, n + 1), index=keys[top])
+        long = table.stack().rename('Launches').reset_index()
+        long['Rank'] = long[dimension].map(ranks).astype(int)
+        period = 'Year'
+    elif window == 'decade':
+        decades = years // 10 * 10
+        codes, labels = pd.factorize(decades, sort=True)
+        per_decade = np.zeros((len(labels), len(keys)), dtype=np.int64)
+        np.add.at(per_decade, codes, counts.T)
+        long = _ranked(per_decade, pd.Index(labels, name='Decade'), keys, n)
+        period = 'Decade'
+    else:
+        width = int(window)
+        # rolling sums along the year axis from one cumulative sum
+        cumulative = np.concatenate([np.zeros((len(keys), 1), dtype=np.int64), np.cumsum(counts, axis=1)], axis=1)
+        lagged = np.concatenate([np.zeros((len(keys), width), dtype=np.int64), cumulative], axis=1)[:, :cumulative.shape[1]]
+        rolling = (cumulative - lagged)[:, 1:]
+        long = _ranked(rolling.T, years, keys, n)
+        period = 'Year'
+
+    if dropzero:
+        long = long[long['Launches'] > 0]
+    return long.sort_values([period, 'Rank'], ignore_index=True)
+
+
+def _ranked(values, periods, keys, n):
+    # (periods x keys) values -> long table of the top n keys per period
+    top = _top(values, n)
+    picked = np.take_along_axis(values, top, axis=1)
+    return pd.DataFrame({
+        periods.name: np.repeat(periods.to_numpy(), n),
+        keys.name: keys.to_numpy()[top.ravel()],
+        'Launches': picked.ravel(),
+        'Rank': np.tile(np.arange(1, n + 1), len(periods)),
+    })
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitters sketch with a fixed number of counters.
+
+    Every key whose true count is above total / capacity is guaranteed to be kept, and
+    for a kept key: count - error <= true count <= count.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = int(capacity)
+        self.total = 0
+        self.counts = {}
+        self.errors = {}
+        # lazy min-heap of (count, tie-breaker, key); stale entries are skipped when popped
+        self._heap = []
+        self._pushes = itertools.count()
+
+    def __len__(self):
+        return len(self.counts)
+
+    def update(self, items, weights=None):
+        """Add a batch of keys; repeats inside the batch are counted together first."""
+        items = pd.Series(items)
+        if weights is None:
+            batch = items.value_counts(sort=False, dropna=True)
+        else:
+            batch = pd.Series(np.asarray(weights)).groupby(items.to_numpy(), sort=False, dropna=True).sum()
+        self.total += int(batch.sum())
+
+        for key, count in zip(batch.index, batch.to_numpy()):
+            count = int(count)
+            if key in self.counts:
+                self.counts[key] += count
+            elif len(self.counts) < self.capacity:
+                self.counts[key] = count
+                self.errors[key] = 0
+            else:
+                smallest, evicted = self._pop_min()
+                del self.counts[evicted], self.errors[evicted]
+                self.counts[key] = smallest + count
+                self.errors[key] = smallest
+            heapq.heappush(self._heap, (self.counts[key], next(self._pushes), key))
+        # stale entries only go away on eviction, so rebuild to keep memory bounded
+        if len(self._heap) > 2 * self.capacity:
+            self._heap = [(count, next(self._pushes), key) for key, count in self.counts.items()]
+            heapq.heapify(self._heap)
+        return self
+
+    def _pop_min(self):
+        while True:
+            count, _, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                return count, key
+
+    def top(self, n=10):
+        """The n keys with the highest estimated counts, with their error bounds."""
+        table = pd.DataFrame({'Count': pd.Series(self.counts, dtype=np.int64),
+                              'Error': pd.Series(self.errors, dtype=np.int64)})
+        table['Lower'] = table['Count'] - table['Error']
+        # guaranteed means no key outside the sketch could have a larger true count
+        floor = min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+        table['Guaranteed'] = table['Lower'] >= floor
+        return table.sort_values(['Count', 'Lower'], ascending=False).head(n)
+
+
+def heavy_hitters(chunks, dimension='Organisation', n=10, capacity=100, window=None):
+    """Approximate top-n over a stream of DataFrame chunks with Space-Saving.
+
+    window -- None for one sketch over everything, 'year' or 'decade' for one per period
+
+    Returns a long DataFrame with the period (if any), the dimension, Count, Error,
+    Lower and Guaranteed columns.
+    """
+    sketches = {}
+    for chunk in chunks:
+        labels = pd.Series(_labels(chunk, dimension)).to_numpy()
+        if window is None:
+            periods = np.zeros(len(chunk), dtype=np.int64)
+        else:
+            year = pd.array(chunk['Year'], dtype='Int64')
+            periods = year // 10 * 10 if window == 'decade' else year
+            keep = ~pd.isna(periods)
+            labels, periods = labels[keep], np.asarray(periods[keep], dtype=np.int64)
+        for period in np.unique(periods):
+            sketch = sketches.setdefault(period, SpaceSaving(capacity))
+            sketch.update(labels[periods == period])
+
+    frames = []
+    for period in sorted(sketches):
+        top = sketches[period].top(n).rename_axis(dimension).reset_index()
+        top.insert(1, 'Rank', np.arange(1, len(top) + 1))
+        if window is not None:
+            top.insert(0, 'Decade' if window == 'decade' else 'Year', period)
+        frames.append(top)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
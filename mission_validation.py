@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Data-quality checks for the mission table.
+#
+# The notebook only prints isna() and duplicated(). A Location get_iso can't resolve
+# silently becomes a None ISO and a malformed Date makes date_process raise halfway
+# through the run. validate() checks every rule over the whole table at once, keeps the
+# good rows (cleaned, like clean_missions) and moves the bad ones to a quarantine table
+# with the reasons they failed, so one bad row never stops the ingest:
+#
+#   valid, quarantine = validate(df_raw)
+#   write_quarantine(quarantine, 'quarantine.csv')
+#
+# or, for files too big to load at once:
+#
+#   valid = validate_csv('mission_launches.csv', 'quarantine.csv', chunksize=500_000)
+
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+from mission_cleaning import has_time_of_day, iso_codes, parse_dates, parse_prices
+
+
+MISSION_STATUSES = ['Success', 'Failure', 'Partial Failure', 'Prelaunch Failure']
+ROCKET_STATUSES = ['StatusActive', 'StatusRetired']
+
+FIRST_YEAR = 1957
+# USD millions, Energia was about 5,000 so anything past this is a typo
+MAX_PRICE = 10_000.0
+
+# reason code -> description, in the order they are reported
+REASONS = {
+    'missing_organisation': 'Organisation is empty',
+    'missing_location': 'Location is empty',
+    'missing_date': 'Date is empty',
+    'bad_date': 'Date matches neither date format',
+    'year_out_of_range': f'Year is before {FIRST_YEAR} or in the future',
+    'unknown_iso': 'Location does not resolve to a country code',
+    'bad_price': 'Price is not a number',
+    'negative_price': 'Price is negative',
+    'absurd_price': f'Price is above {MAX_PRICE:,.0f} million',
+    'unknown_mission_status': 'Mission_Status is not a known label',
+    'unknown_rocket_status': 'Rocket_Status is not a known label',
+}
+
+
+def _blank(series):
+    return series.isna().to_numpy() | (series.astype('string').str.strip() == '').fillna(True).to_numpy()
+
+
+def check_rules(df, max_price=MAX_PRICE, last_year=None):
+    """Boolean DataFrame with one column per reason code, True where a row breaks the rule.
+
+    Also returns the parsed Date, Price and ISO so they don't have to be worked out twice.
+    """
+    last_year = last_year or datetime.date.today().year
+    n = len(df)
+    empty = pd.Series([None] * n, index=df.index, dtype=object)
+    failed = {}
+
+    organisation = df['Organisation'] if 'Organisation' in df else empty
+    location = df['Location'] if 'Location' in df else empty
+    dates = df['Date'] if 'Date' in df else empty
+    prices = df['Price'] if 'Price' in df else pd.Series(np.nan, index=df.index)
+
+    failed['missing_organisation'] = _blank(organisation)
+    failed['missing_location'] = _blank(location)
+    failed['missing_date'] = _blank(dates)
+
+    parsed_dates = parse_dates(dates)
+    failed['bad_date'] = parsed_dates.isna().to_numpy() & ~failed['missing_date']
+    year = parsed_dates.dt.year
+    failed['year_out_of_range'] = ((year < FIRST_YEAR) | (year > last_year)).fillna(False).to_numpy(bool)
+
+    iso = iso_codes(location)
+    failed['unknown_iso'] = iso.isna().to_numpy() & ~failed['missing_location']
+
+    parsed_prices = parse_prices(prices)
+    failed['bad_price'] = parsed_prices.isna().to_numpy() & ~_blank(prices)
+    failed['negative_price'] = (parsed_prices < 0).to_numpy()
+    failed['absurd_price'] = (parsed_prices > max_price).to_numpy()
+
+    mission_status = df['Mission_Status'] if 'Mission_Status' in df else empty
+    rocket_status = df['Rocket_Status'] if 'Rocket_Status' in df else empty
+    failed['unknown_mission_status'] = ~mission_status.isin(MISSION_STATUSES).to_numpy()
+    failed['unknown_rocket_status'] = ~rocket_status.isin(ROCKET_STATUSES).to_numpy()
+
+    return pd.DataFrame(failed, index=df.index), parsed_dates, parsed_prices, iso
+
+
+def reason_labels(failed):
+    """'reason;reason' text per row from the boolean rule table ('' for good rows).
+
+    Rows are encoded as a bitmask first so the text is only built once per distinct
+    combination of failures rather than once per row.
+    """
+    bits = failed.to_numpy().astype(np.int64) @ (1 << np.arange(failed.shape[1], dtype=np.int64))
+    masks, inverse = np.unique(bits, return_inverse=True)
+    names = np.array(failed.columns)
+    text = np.array([';'.join(names[(mask >> np.arange(len(names))) & 1 == 1]) for mask in masks], dtype=object)
+    return pd.Series(text[inverse.ravel()], index=failed.index, name='Reasons')
+
+
+def validate(df, max_price=MAX_PRICE, last_year=None, ignore=()):
+    """Split a raw mission table into (valid, quarantine).
+
+    valid has the same cleaned columns as clean_missions (parsed Date, numeric Price, ISO,
+    Year, Month, Has_Time). quarantine keeps the raw values of the rejected rows plus a Reasons
+    column of semicolon separated reason codes (see REASONS). Reason codes listed in
+    `ignore` don't send a row to quarantine, e.g. ignore=['unknown_iso'] keeps sea
+    launches the notebook counts with a None ISO.
+    """
+    failed, dates, prices, iso = check_rules(df, max_price, last_year)
+    failed = failed.drop(columns=list(ignore))
+    bad = failed.any(axis=1).to_numpy()
+
+    quarantine = df.loc[bad].copy()
+    quarantine['Reasons'] = reason_labels(failed.loc[bad])
+
+    valid = df.loc[~bad].copy()
+    if 'Has_Time' not in valid and not pd.api.types.is_datetime64_any_dtype(valid['Date']):
+        valid['Has_Time'] = has_time_of_day(valid['Date'])
+    valid['Date'] = dates[~bad]
+    valid['Price'] = prices[~bad]
+    valid['ISO'] = iso[~bad]
+    valid['Year'] = valid['Date'].dt.year.astype('Int16')
+    valid['Month'] = valid['Date'].dt.month.astype('Int8')
+    return valid, quarantine
+
+
+def reason_counts(quarantine):
+    """How many quarantined rows failed each rule."""
+    codes = quarantine['Reasons'].str.split(';').explode()
+    return codes.value_counts().reindex(list(REASONS), fill_value=0).rename('Rows')
+
+
+def write_quarantine(quarantine, path, append=False):
+    """Write (or append) quarantined rows to a CSV file."""
+    header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+    quarantine.to_csv(path, mode='a' if append else 'w', header=header, index=False)
+
+
+def validate_csv(path, quarantine_path, chunksize=None, max_price=MAX_PRICE, last_year=None, ignore=(),
+                 **read_csv_kwargs):
+    """Validate a CSV in chunks, appending bad rows to quarantine_path; returns the valid rows."""
+    if chunksize is None:
+        valid, quarantine = validate(pd.read_csv(path, **read_csv_kwargs), max_price, last_year, ignore)
+        write_quarantine(quarantine, quarantine_path)
+        return valid
+
+    parts = []
+    for number, chunk in enumerate(pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs)):
+        valid, quarantine = validate(chunk, max_price, last_year, ignore)
+        # the first chunk always writes, so the file exists with a header even if it stays empty
+        if number == 0 or len(quarantine):
+            write_quarantine(quarantine, quarantine_path, append=number > 0)
+        parts.append(valid)
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()